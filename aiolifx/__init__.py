@@ -1,5 +1,16 @@
-from .aiolifx import LifxDiscovery, LifxScan
+from .aiolifx import (
+    DEVICE_DISCOVERED,
+    DEVICE_REDISCOVERED,
+    DEVICE_REGISTERED,
+    DEVICE_UNREGISTERED,
+    DiscoveryEvent,
+    LifxDiscovery,
+    LifxScan,
+    REPLACED,
+    SharedSocket,
+    fire_and_forget_batch,
+)
 from .connection import LIFXConnection
 from .message import *
 from .msgtypes import *
-from .unpack import unpack_lifx_message
+from .unpack import unpack_lifx_message, unpack_lifx_header, MessageHeader
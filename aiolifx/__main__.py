@@ -27,6 +27,7 @@ import asyncio as aio
 
 import click
 import aiolifx as alix
+from aiolifx.aiolifx import _create_background_task
 from functools import partial
 from time import sleep
 from InquirerPy import inquirer
@@ -46,12 +47,7 @@ class bulbs:
 
     def register(self, bulb):
         global opts
-        bulb.get_label()
-        bulb.get_location()
-        bulb.get_version()
-        bulb.get_group()
-        bulb.get_wififirmware()
-        bulb.get_hostfirmware()
+        _create_background_task(bulb.refresh())
         self.bulbs.append(bulb)
         self.bulbs.sort(key=lambda x: x.label or x.mac_addr)
         if opts["extra"]:
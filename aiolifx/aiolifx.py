@@ -25,36 +25,72 @@
 # IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE
 import asyncio as aio
 import datetime
+import heapq
+import ipaddress
+import itertools
 import logging
 import random
 import socket
-from functools import partial
+import weakref
+from functools import lru_cache, partial
 from math import floor, ceil
 from typing import Coroutine, Set
 
 import ifaddr
 
+from .cache import DeviceCache
+from .message import MAC_CACHE_SIZE, HSBKZones, mac_to_bytes, pack_messages
 from .msgtypes import *
 from .products import *
-from .unpack import unpack_lifx_message
+from .unpack import unpack_lifx_header
 
 # prevent tasks from being garbage collected
 _BACKGROUND_TASKS: Set[aio.Task] = set()
 
-if sys.version_info[:2] < (3, 11):
-    from async_timeout import timeout as asyncio_timeout
-else:
-    from asyncio import timeout as asyncio_timeout
-
 # A couple of constants
 LISTEN_IP = "0.0.0.0"
 UDP_BROADCAST_IP = "255.255.255.255"
 UDP_BROADCAST_PORT = 56700
 DEFAULT_TIMEOUT = 0.5  # How long to wait for an ack or response
+# Shortest wait for an ack or response, see Device.retransmit_timeout
+MIN_TIMEOUT = 0.05
 DEFAULT_ATTEMPTS = 3  # How many time shou;d we try to send to the bulb`
+DEFAULT_SEND_RATE = 20  # Max num of messages a device can handle per second
+DEFAULT_SEND_BURST = 5  # How many messages can be sent back to back
+# How many messages can wait to be sent to a device, as many as the requests that can
+# be in flight with one source id (see Device.seq_next)
+DEFAULT_SEND_QUEUE = 256
 DISCOVERY_INTERVAL = 180
 DISCOVERY_STEP = 5
+DISCOVERY_BURST = 3  # How many broadcasts in a discovery burst
+DISCOVERY_BURST_STEP = 1  # Seconds between the broadcasts of a burst
+CACHE_SAVE_DELAY = 10  # Seconds to wait before saving the device cache
+SWEEP_RATE = 500  # Addresses probed per second by a discovery sweep
+SWEEP_BATCH = 10  # Addresses probed back to back by a discovery sweep
+SWEEP_MIN_PREFIX = 16  # Largest network a discovery sweep accepts, a /16
+INTERFACE_CACHE_TTL = 60  # Seconds LifxScan reuses the list of network interfaces
+EVENT_QUEUE_SIZE = 64  # How many discovery events can wait for a subscriber
+# Kinds of DiscoveryEvent
+DEVICE_DISCOVERED = "discovered"  # A new device was found
+DEVICE_REDISCOVERED = "rediscovered"  # A lost device was found at another address
+DEVICE_REGISTERED = "registered"
+DEVICE_UNREGISTERED = "unregistered"
 MAX_UNSIGNED_16_BIT_INTEGER_VALUE = int("0xFFFF", 16)
+# Priority classes of the messages sent to a device, the lowest goes first
+PRIORITY_SET = 0  # Interactive changes
+PRIORITY_GET = 1  # State polls
+PRIORITY_BULK = 2  # Reads answered by many replies (zones, tiles)
+# Writes coalesced by Device.coalesce, with the payload fields naming their target
+COALESCED_WRITES = {
+    LightSetColor: (),
+    LightSetPower: (),
+    SetPower: (),
+    MultiZoneSetColorZones: ("start_index", "end_index"),
+    MultiZoneSetExtendedColorZones: ("zone_index", "colors_count"),
+    TileSet64: ("tile_index", "length", "x", "y", "width"),
+}
+# Returned by TokenBucket.send when the queue is full and the datagram is not sent
+DROPPED = object()
 _LOGGER = logging.getLogger(__name__)
 
 
@@ -66,6 +102,373 @@ def _create_background_task(coro: Coroutine) -> None:
     task.add_done_callback(_BACKGROUND_TASKS.discard)
 
 
+class Replaced:
+    """Answer passed to the callback of a write superseded by a newer one.
+
+    Like the None passed when the device does not answer, it is falsy.
+    """
+
+    def __bool__(self):
+        return False
+
+    def __repr__(self):
+        return "REPLACED"
+
+
+REPLACED = Replaced()
+
+
+def _chain(callb, other):
+    """Return a callback executing callb, then other. Either may be None."""
+    if callb is None:
+        return other
+    if other is None:
+        return callb
+
+    def both(device, response):
+        callb(device, response)
+        other(device, response)
+
+    return both
+
+
+def _wake(waiter):
+    """Resolve the Future waiting for the completion of a request, if any.
+
+    See Device.try_sending and Device.async_request.
+    """
+    if waiter is not None and not waiter.done():
+        waiter.set_result(True)
+
+
+class TokenBucket:
+    """Pace the datagrams sent to a device.
+
+    Each datagram sent takes a token, and tokens come back at rate per second, up to
+    burst. When no token is left, the datagrams wait in a queue ordered by priority
+    class, then by age, and are sent as the tokens come back. A queued datagram sent
+    again with the same key is replaced by the new one, keeping its place.
+
+    While the transport is paused (see pause), everything waits in the queue. The
+    queue holds at most limit datagrams, beyond that the least urgent one is dropped.
+    The coalesced and dropped datagrams are counted.
+
+        :param device: The device the datagrams are sent to
+        :type device: Device
+        :param rate: Number of datagrams per second
+        :type rate: float
+        :param burst: Number of datagrams that can be sent back to back
+        :type burst: int
+        :param limit: Number of datagrams the queue can hold
+        :type limit: int
+    """
+
+    def __init__(
+        self,
+        device,
+        rate=DEFAULT_SEND_RATE,
+        burst=DEFAULT_SEND_BURST,
+        limit=DEFAULT_SEND_QUEUE,
+    ):
+        self.device = device
+        self.rate = rate
+        self.burst = burst
+        self.limit = limit
+        self.tokens = burst
+        self.stamp = device.loop.time()
+        self.queue = []
+        self.keyed = {}  # Queue entries by key
+        self.counter = 0  # Keeps the queue ordering stable within a priority class
+        self.timer = None
+        self.paused = False
+        self.coalesced = 0  # Datagrams replaced by a newer one while queued
+        self.dropped = 0  # Datagrams dropped because the queue was full
+
+    def send(self, data, priority=PRIORITY_GET, key=None):
+        """Send a datagram now if a token is available, queue it otherwise.
+
+        :param data: The datagram
+        :type data: bytes
+        :param priority: The priority class, one of the PRIORITY_* values
+        :type priority: int
+        :param key: What the datagram changes, see Device.queue_key
+        :type key: tuple
+        :returns: None if the datagram was sent, DROPPED if it was dropped, otherwise
+                  its queue entry: a list whose only item is set to None once the
+                  datagram is sent.
+        :rtype: list
+        """
+        entry = self.keyed.get(key)
+        if entry is not None:
+            entry[0] = bytes(data)
+            self.coalesced += 1
+            return entry
+        if not self.queue and not self.paused:
+            self.refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                self.sendto(data)
+                return None
+        self.counter += 1
+        if len(self.queue) >= self.limit:
+            worst = max(self.queue)
+            if (priority, self.counter) > worst[:2]:
+                self.dropped += 1
+                return DROPPED
+            self.discard(worst)
+        entry = [bytes(data)]  # A buffer may be reused by the caller meanwhile
+        heapq.heappush(self.queue, (priority, self.counter, entry, key))
+        if key is not None:
+            self.keyed[key] = entry
+        self.arm()
+        return entry
+
+    def discard(self, item):
+        """Drop a queued datagram, as if lost on the way."""
+        self.queue.remove(item)
+        heapq.heapify(self.queue)
+        _, _, entry, key = item
+        if key is not None:
+            del self.keyed[key]
+        entry[0] = None
+        self.dropped += 1
+
+    def pause(self):
+        """Hold the datagrams in the queue until resume is called."""
+        self.paused = True
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+
+    def resume(self):
+        """Send the datagrams held while paused, as the tokens allow."""
+        self.paused = False
+        self.drain()
+
+    def refill(self):
+        now = self.device.loop.time()
+        self.tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+        self.stamp = now
+
+    def arm(self):
+        if self.timer is None and self.queue and not self.paused:
+            self.timer = self.device.loop.call_later(
+                (1 - self.tokens) / self.rate, self.drain
+            )
+
+    def drain(self):
+        """Send the queued datagrams the tokens allow, then wait for the next one."""
+        self.timer = None
+        self.refill()
+        while self.queue and self.tokens >= 1 and not self.paused:
+            _, _, entry, key = heapq.heappop(self.queue)
+            if key is not None:
+                del self.keyed[key]
+            self.tokens -= 1
+            data, entry[0] = entry[0], None
+            self.sendto(data)
+        self.arm()
+
+    def sendto(self, data):
+        if self.device.transport:
+            self.device.transport.sendto(data)
+
+    def clear(self):
+        """Drop the queued datagrams."""
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        for _, _, entry, _ in self.queue:
+            entry[0] = None
+        self.queue.clear()
+        self.keyed.clear()
+
+
+class RetryScheduler:
+    """Resend the requests that have not been answered in time.
+
+    All the devices using the same event loop share one scheduler: a heap of
+    deadlines with a single timer armed for the earliest one. When a deadline
+    expires and the request is still pending, the message is sent again, or
+    after the last attempt, the request fails: its callback is called with
+    None and the device is unregistered.
+
+    Requests answered in the meantime are not removed from the heap, they are
+    skipped when their deadline comes. The datagrams go through the TokenBucket of
+    the device, so resends count against its rate, and an attempt still waiting for
+    a token gets more time instead of being sent again. A request whose datagram is
+    dropped because the queue is full fails right away.
+
+    Unless a timeout is given, each attempt waits Device.retransmit_timeout, and
+    the requests sent once and answered give the device its round trip time.
+
+        :param loop: The asyncio loop being used
+        :type loop: asyncio.AbstractEventLoop
+    """
+
+    def __init__(self, loop):
+        self.loop = loop
+        self.deadlines = []
+        self.counter = 0  # Keeps the heap ordering stable for equal deadlines
+        self.timer = None
+
+    def schedule(self, device, msg, timeout_secs, max_attempts):
+        """Send a request and resend it until answered.
+
+        The request must already be registered in device.message.
+
+            :param device: The device the request is sent to
+            :type device: Device
+            :param msg: The message to send
+            :type msg: aiolifx.Message
+            :param timeout_secs: Number of seconds to wait for each attempt, None to
+                                 adapt it to the device
+            :type timeout_secs: float
+            :param max_attempts: Number of times the message is sent at most
+            :type max_attempts: int
+        """
+        key = (msg.source_id, msg.seq_num)
+        entry = device.message.get(key)
+        if entry is None:
+            return
+        now = self.loop.time()
+        queued = device.send_message(msg)
+        if queued is DROPPED:
+            # Never sent, there is no point in waiting for an answer
+            device.fail_request(key)
+            return
+        if queued is None:
+            device.sent_at[key] = now
+        else:
+            device.sent_at.pop(key, None)
+        self.push(
+            now + (timeout_secs or device.retransmit_timeout()),
+            (device, msg, entry, timeout_secs, 1, max_attempts, queued),
+        )
+
+    def push(self, deadline, request):
+        self.counter += 1
+        heapq.heappush(self.deadlines, (deadline, self.counter, request))
+        if self.timer is None or deadline < self.timer.when():
+            if self.timer is not None:
+                self.timer.cancel()
+            self.timer = self.loop.call_at(deadline, self.expire)
+
+    def expire(self):
+        """Handle the expired deadlines and arm the timer for the next one."""
+        self.timer = None
+        now = self.loop.time()
+        while self.deadlines and self.deadlines[0][0] <= now:
+            _, _, request = heapq.heappop(self.deadlines)
+            device, msg, entry, timeout_secs, attempts, max_attempts, queued = request
+            key = (msg.source_id, msg.seq_num)
+            if device.message.get(key) is not entry:
+                continue  # Answered, or given up
+            if queued is not None and queued[0] is not None:
+                # Not sent yet, the attempt has not started
+                self.push(
+                    now + (timeout_secs or device.retransmit_timeout(attempts - 1)),
+                    request,
+                )
+            elif attempts < max_attempts:
+                # An answer could be to any of the attempts, no round trip time
+                device.sent_at.pop(key, None)
+                queued = device.send_message(msg)
+                if queued is DROPPED:
+                    device.fail_request(key)
+                    continue
+                self.push(
+                    now + (timeout_secs or device.retransmit_timeout(attempts)),
+                    (
+                        device,
+                        msg,
+                        entry,
+                        timeout_secs,
+                        attempts + 1,
+                        max_attempts,
+                        queued,
+                    ),
+                )
+            else:
+                device.fail_request(key)
+                # It's dead Jim
+                device.unregister()
+        if self.deadlines and self.timer is None:
+            self.timer = self.loop.call_at(self.deadlines[0][0], self.expire)
+
+
+# One RetryScheduler per event loop
+_RETRY_SCHEDULERS = weakref.WeakKeyDictionary()
+
+
+def retry_scheduler(loop):
+    """Return the RetryScheduler shared by the devices using loop."""
+    scheduler = _RETRY_SCHEDULERS.get(loop)
+    if scheduler is None:
+        scheduler = _RETRY_SCHEDULERS[loop] = RetryScheduler(loop)
+    return scheduler
+
+
+def fire_and_forget_batch(requests, num_repeats=1, buffer=None):
+    """Send messages to many devices at once, without waiting for acks or responses.
+
+    All the datagrams are packed in a single buffer (see pack_messages) and handed
+    to the TokenBucket of each device. With the default single repeat, they are
+    sent right away, otherwise one background task repeats the whole batch.
+
+    Devices that are not connected are skipped. On the devices coalescing writes, the
+    pending write changing the same thing is replaced, as with Device.fire_and_forget.
+
+        :param requests: (device, msg_type, payload) for each message to send
+        :type requests: list
+        :param num_repeats: Number of times the messages are to be sent.
+        :type num_repeats: int
+        :param buffer: Buffer to pack the messages in, reused when large enough
+        :type buffer: bytearray
+        :returns: The number of messages sent
+        :rtype: int
+    """
+    devices = []
+    msgs = []
+    for device, msg_type, payload in requests:
+        if device.transport:
+            msg = msg_type(
+                device.mac_addr,
+                device.source_id,
+                seq_num=0,
+                payload=payload,
+                ack_requested=False,
+                response_requested=False,
+            )
+            msg.header_templates = device.header_templates
+            key = device.write_key(msg) if device.coalesce else None
+            if key is not None:
+                device.replace_write(key)
+            devices.append(device)
+            msgs.append(msg)
+    batch = [
+        (device, datagram, device.queue_key(msg))
+        for device, msg, datagram in zip(devices, msgs, pack_messages(msgs, buffer))
+    ]
+    if num_repeats <= 1:
+        for device, datagram, key in batch:
+            device.sender.send(datagram, PRIORITY_SET, key)
+    else:
+        # The datagrams must outlive a buffer the caller may reuse
+        batch = [(device, bytes(datagram), key) for device, datagram, key in batch]
+        _create_background_task(_fire_batch(batch, num_repeats))
+    return len(batch)
+
+
+async def _fire_batch(batch, num_repeats):
+    """Coroutine repeating a batch of datagrams, see fire_and_forget_batch."""
+    for _ in range(num_repeats):
+        for device, datagram, key in batch:
+            device.sender.send(datagram, PRIORITY_SET, key)
+        await aio.sleep(0.05)  # Max num of messages device can handle is 20 per second.
+
+
+@lru_cache(maxsize=MAC_CACHE_SIZE)
 def mac_to_ipv6_linklocal(mac, prefix="fe80::"):
     """Translate a MAC address into an IPv6 address in the prefixed network.
 
@@ -83,10 +486,7 @@ def mac_to_ipv6_linklocal(mac, prefix="fe80::"):
     """
 
     # Remove the most common delimiters; dots, dashes, etc.
-    mac_value = int(
-        mac.translate(str.maketrans(dict([(x, None) for x in [" ", ".", ":", "-"]]))),
-        16,
-    )
+    mac_value = int.from_bytes(mac_to_bytes(mac), "big")
     # Split out the bytes that slot into the IPv6 address
     # XOR the most significant byte with 0x02, inverting the
     # Universal / Local bit
@@ -97,6 +497,26 @@ def mac_to_ipv6_linklocal(mac, prefix="fe80::"):
     return prefix + ":{:04x}:{:02x}ff:fe{:02x}:{:04x}".format(high2, high1, low1, low2)
 
 
+def sweep_network(network):
+    """Parse a network for a discovery sweep, see LifxDiscovery.
+
+    :param network: The network in CIDR notation, e.g. "192.168.4.0/22"
+    :type network: str
+    :returns: The network
+    :rtype: ipaddress.IPv4Network
+    :raises ValueError: If network is not an IPv4 network of prefix length at least
+                        SWEEP_MIN_PREFIX
+    """
+    parsed = ipaddress.ip_network(network, strict=False)
+    if parsed.version != 4:
+        raise ValueError(f"Only IPv4 networks can be swept, not {network}")
+    if parsed.prefixlen < SWEEP_MIN_PREFIX:
+        raise ValueError(
+            f"Network {network} is too large to sweep, the largest is a /{SWEEP_MIN_PREFIX}"
+        )
+    return parsed
+
+
 def nanosec_to_hours(ns):
     """Convert nanoseconds to hours
 
@@ -135,14 +555,33 @@ class Device(aio.DatagramProtocol):
         self.retry_count = DEFAULT_ATTEMPTS
         self.timeout = DEFAULT_TIMEOUT
         self.unregister_timeout = DEFAULT_TIMEOUT
+        # Smoothed round trip time and its variation, see retransmit_timeout
+        self.srtt = None
+        self.rttvar = None
+        # When the requests sent only once were sent, key is (source id, sequence)
+        self.sent_at = {}
+        # HeaderTemplate of the messages sent, by source id and message type
+        self.header_templates = {}
         self.transport = None
+        # Paces everything sent to the device, see set_send_rate
+        self.sender = TokenBucket(self)
+        # When True, a write supersedes the pending one changing the same thing
+        self.coalesce = False
+        # Key is what a write changes, value is (request id, entry) of the latest one
+        self.writes = {}
+        # Key is a Get type and payload, value is (request id, entry) of the last one
+        self.gets = {}
         self.task = None
-        self.seq = 0
-        # Key is the message sequence, value is (Response, Event, callb )
+        self.seq = 0  # Last sequence number used, wraps around at 256
+        # Key is (source id, sequence number), value is [response type, waiter, callb]
+        # where waiter is the Future resolved when the request is done, or None
         self.message = {}
         # Reply queue tracks how many replies are expected for a single message
         self.reply_queue = {}
         self.source_id = random.randint(0, (2**32) - 1)
+        # Source ids used in turn for the requests, see set_source_rotation
+        self.source_ids = [self.source_id]
+        self.source_index = 0
         # Default callback for unexpected messages
         self.default_callb = None
         # And the rest
@@ -162,12 +601,307 @@ class Device(aio.DatagramProtocol):
     def seq_next(self):
         """Method to return the next sequence value to use in messages.
 
-        :returns: next number in sequensce (modulo 128)
+        :returns: next number in sequence (modulo 256)
         :rtype: int
         """
-        self.seq = (self.seq + 1) % 128
+        self.seq = (self.seq + 1) % 256
         return self.seq
 
+    def set_source_rotation(self, count):
+        """Method to use several source ids for the requests.
+
+        Each source id has its own 256 sequence numbers, so with count source ids up to
+        256 * count requests can be in flight at once. The requests move to the next
+        source id each time the sequence wraps around.
+
+            :param count: Number of source ids to rotate through, 1 disables rotation
+            :type count: int
+        """
+        self.source_ids = [self.source_id] + [
+            random.randint(1, (2**32) - 1) for _ in range(count - 1)
+        ]
+        self.source_index = 0
+
+    def update_rtt(self, rtt):
+        """Method to account for a round trip time measured with the device.
+
+        :param rtt: Seconds between a request and its answer
+        :type rtt: float
+        """
+        if self.srtt is None:
+            self.srtt = rtt
+            self.rttvar = rtt / 2
+        else:
+            self.rttvar = 0.75 * self.rttvar + 0.25 * abs(self.srtt - rtt)
+            self.srtt = 0.875 * self.srtt + 0.125 * rtt
+
+    def retransmit_timeout(self, attempt=0):
+        """Method to return how long to wait for an answer before resending a request.
+
+        Until the device has answered, this is self.timeout. Then it is derived from the
+        round trip time of the device as in RFC 6298, doubled with each resend, and kept
+        between MIN_TIMEOUT and self.timeout * self.retry_count.
+
+            :param attempt: Number of times the request has already been resent
+            :type attempt: int
+            :returns: Number of seconds
+            :rtype: float
+        """
+        if self.srtt is None:
+            return self.timeout
+        timeout = (self.srtt + 4 * self.rttvar) * 2**attempt
+        return min(max(timeout, MIN_TIMEOUT), self.timeout * self.retry_count)
+
+    def set_send_rate(self, rate, burst=None):
+        """Method to set how fast messages can be sent to the device.
+
+        :param rate: Number of messages per second
+        :type rate: float
+        :param burst: Number of messages that can be sent back to back
+        :type burst: int
+        """
+        self.sender.refill()
+        self.sender.rate = rate
+        if burst is not None:
+            self.sender.burst = burst
+            self.sender.tokens = min(self.sender.tokens, burst)
+
+    def request_priority(self, msg):
+        """Method to return the priority class of a message sent to the device.
+
+        Changes go first, then state polls, then the reads answered by many replies.
+
+            :param msg: The message to send
+            :type msg: aiolifx.Message
+            :returns: One of the PRIORITY_* values
+            :rtype: int
+        """
+        if type(msg) in WRITE_MESSAGES:
+            return PRIORITY_SET
+        if (msg.source_id, msg.seq_num) in self.reply_queue:
+            return PRIORITY_BULK
+        return PRIORITY_GET
+
+    def write_key(self, msg):
+        """Method to return what a write message changes.
+
+        :param msg: The message to send
+        :type msg: aiolifx.Message
+        :returns: The message type and target, or None if the message is not
+                  a write that can be coalesced.
+        :rtype: tuple
+        """
+        fields = COALESCED_WRITES.get(msg.__class__)
+        if fields is None:
+            return None
+        return (msg.__class__,) + tuple(getattr(msg, field) for field in fields)
+
+    def queue_key(self, msg):
+        """Method to return the key under which a message waiting to be sent is coalesced.
+
+        Writes superseded when coalesced (see self.coalesce), and writes without ack,
+        are replaced by a newer one changing the same thing while they wait.
+
+        :param msg: The message to send
+        :type msg: aiolifx.Message
+        :returns: The key, or None if the message is not to be replaced
+        :rtype: tuple
+        """
+        if self.coalesce or not (msg.ack_requested or msg.response_requested):
+            return self.write_key(msg)
+        return None
+
+    def replace_write(self, key):
+        """Method to drop the pending write for key, superseded by a newer one.
+
+        Its callback is called with REPLACED and it is no longer resent.
+
+            :param key: What the write changes, see write_key
+            :type key: tuple
+        """
+        request_id, entry = self.writes.pop(key, (None, None))
+        if entry is not None and self.message.get(request_id) is entry:
+            del self.message[request_id]
+            self.reply_queue.pop(request_id, None)
+            response_type, waiter, callb = entry
+            if callb:
+                callb(self, REPLACED)
+            _wake(waiter)
+
+    def fail_request(self, request_id):
+        """Method to drop a request that will not be answered.
+
+        Its callback is called with None, its waiter resolved, and it is no longer resent.
+
+            :param request_id: The source id and sequence number of the request
+            :type request_id: tuple
+        """
+        entry = self.message.pop(request_id, None)
+        self.reply_queue.pop(request_id, None)
+        self.sent_at.pop(request_id, None)
+        if entry is not None:
+            response_type, waiter, callb = entry
+            if callb:
+                callb(self, None)
+            _wake(waiter)
+
+    def get_key(self, msg_type, response_type, payload):
+        """Method to return what a Get request asks for, when it can be shared.
+
+        Requests expecting an ack or many replies are never shared.
+
+            :param msg_type: The type of the message to send, a subclass of aiolifx.Message
+            :type msg_type: class
+            :param response_type: The type of the answer to expect, a subclass of aiolifx.Message
+            :type response_type: class
+            :param payload: value to use when instantiating msg_type
+            :type payload: dict
+            :returns: The message and response types and the payload, or None
+            :rtype: tuple
+        """
+        if (
+            response_type is Acknowledgement
+            or msg_type in WRITE_MESSAGES
+            or "replies" in payload
+        ):
+            return None
+        try:
+            return (msg_type, response_type, frozenset(payload.items()))
+        except TypeError:  # Unhashable payload
+            return None
+
+    def join_request(self, msg_type, response_type, payload, callb=None, waiter=None):
+        """Method to attach to an identical Get request already in flight.
+
+        Instead of sending its own request, the caller shares the pending one: callb
+        is executed with its response, and waiter is resolved when it is done. If the
+        caller owning the request cancels it, callb is executed with None and waiter is
+        resolved.
+
+            :param msg_type: The type of the message to send, a subclass of aiolifx.Message
+            :type msg_type: class
+            :param response_type: The type of the answer to expect, a subclass of aiolifx.Message
+            :type response_type: class
+            :param payload: value to use when instantiating msg_type
+            :type payload: dict
+            :param callb: A callback executed for each answer, or with None on failure
+            :type callb: callable
+            :param waiter: A future resolved once the request is done
+            :type waiter: asyncio.Future
+            :returns: True if attached, False if a request is to be sent
+            :rtype: bool
+        """
+        key = self.get_key(msg_type, response_type, payload)
+        if key is None:
+            return False
+        request_id, entry = self.gets.get(key, (None, None))
+        if entry is None or self.message.get(request_id) is not entry:
+            return False
+        if waiter is not None:
+            if entry[1] is None:
+                entry[1] = self.loop.create_future()
+            entry[1].add_done_callback(lambda _: _wake(waiter))
+        entry[2] = _chain(entry[2], callb)
+        return True
+
+    def send_message(self, msg):
+        """Method to hand a message over to the token bucket of the device.
+
+        :param msg: The message to send
+        :type msg: aiolifx.Message
+        :returns: The queue entry, see TokenBucket.send
+        :rtype: list
+        """
+        msg.header_templates = self.header_templates
+        return self.sender.send(
+            msg.packed_message, self.request_priority(msg), self.queue_key(msg)
+        )
+
+    def request_id_next(self):
+        """Method to return the source id and sequence to use for a new request.
+
+        Sequence numbers still in flight are skipped, so a reply can never be matched
+        to the wrong request.
+
+        :returns: (source_id, seq_num), or None if every one of them is in flight
+        :rtype: tuple
+        """
+        for _ in range(256 * len(self.source_ids)):
+            seq_num = self.seq_next()
+            if seq_num == 0:
+                self.source_index = (self.source_index + 1) % len(self.source_ids)
+            request_id = (self.source_ids[self.source_index], seq_num)
+            if request_id not in self.message:
+                return request_id
+        return None
+
+    def new_request(
+        self,
+        msg_type,
+        response_type,
+        payload,
+        ack_requested,
+        response_requested,
+        callb=None,
+        waiter=None,
+    ):
+        """Method to build a request message and register it as in flight.
+
+        When every sequence number is in flight, the request fails right away: callb is
+        called with None and no message is returned. When writes are coalesced, the
+        pending write changing the same thing is replaced, see replace_write.
+
+            :param msg_type: The type of the message to send, a subclass of aiolifx.Message
+            :type msg_type: class
+            :param response_type: The type of the answer to expect, a subclass of aiolifx.Message
+            :type response_type: class
+            :param payload: value to use when instantiating msg_type. A "replies" key
+                            sets how many answers are expected.
+            :type payload: dict
+            :param ack_requested: Whether to request an ack
+            :type ack_requested: bool
+            :param response_requested: Whether to request a response
+            :type response_requested: bool
+            :param callb: A callback executed for each answer, or with None on failure
+            :type callb: callable
+            :param waiter: A future resolved once the request is done
+            :type waiter: asyncio.Future
+            :returns: The message to send, or None
+            :rtype: aiolifx.Message
+        """
+        get_key = self.get_key(msg_type, response_type, payload)
+        replies = payload.pop("replies", None)
+        request_id = self.request_id_next()
+        if request_id is None:
+            _LOGGER.warning(
+                "%s: Too many requests in flight, dropping %s",
+                self.ip_addr,
+                msg_type.__name__,
+            )
+            if callb:
+                callb(self, None)
+            return None
+        source_id, seq_num = request_id
+        msg = msg_type(
+            self.mac_addr,
+            source_id,
+            seq_num=seq_num,
+            payload=payload,
+            ack_requested=ack_requested,
+            response_requested=response_requested,
+        )
+        entry = [response_type, waiter, callb]
+        key = self.write_key(msg) if self.coalesce else None
+        if key is not None:
+            self.replace_write(key)
+            self.writes[key] = (request_id, entry)
+        if get_key is not None:
+            self.gets[get_key] = (request_id, entry)
+        self.message[request_id] = entry
+        if replies is not None:
+            self.reply_queue[request_id] = replies
+        return msg
+
     #
     #                            Protocol Methods
     #
@@ -177,6 +911,19 @@ class Device(aio.DatagramProtocol):
         self.transport = transport
         self.register()
 
+    def pause_writing(self):
+        """Method run when the transport buffer is full.
+
+        Until resume_writing, the messages wait in the queue of self.sender, where
+        the newest write to a target replaces the older ones. When the queue is full,
+        messages are dropped and counted in self.sender.dropped.
+        """
+        self.sender.pause()
+
+    def resume_writing(self):
+        """Method run when the transport buffer has drained."""
+        self.sender.resume()
+
     def error_received(self, exc: Exception) -> None:
         """Method run when an error is received from the device.
 
@@ -185,17 +932,10 @@ class Device(aio.DatagramProtocol):
         In many conditions though, undeliverable datagrams will be silently dropped.
         """
         _LOGGER.debug("%s: Error received: %s", self.ip_addr, exc)
-        # Clear the message queue since we know they are not going to be answered
+        # Fail the pending requests since we know they are not going to be answered
         # and there is no point in waiting for them
-        for entry in self.message.values():
-            response_type, myevent, callb = entry
-            if response_type != Acknowledgement:
-                if callb:
-                    callb(self, None)
-                if myevent:
-                    myevent.set()
-        self.message.clear()
-        self.reply_queue.clear()
+        for request_id in list(self.message):
+            self.fail_request(request_id)
 
     def datagram_received(self, data, addr):
         """Method run when data is received from the device
@@ -212,39 +952,42 @@ class Device(aio.DatagramProtocol):
             :type addr: tuple
         """
         self.register()
-        response = unpack_lifx_message(data)
+        header = unpack_lifx_header(data)
         self.lastmsg = datetime.datetime.now()
-        if response.seq_num in self.message:
-            response_type, myevent, callb = self.message[response.seq_num]
-            if isinstance(response, response_type):
-                if response.source_id == self.source_id:
-                    replies = 0
-                    if self.reply_queue.get(response.seq_num, None):
-                        self.reply_queue[response.seq_num] -= 1
-                        replies = self.reply_queue[response.seq_num]
-                    if "State" in response.__class__.__name__:
-                        setmethod = (
-                            "resp_set_"
-                            + response.__class__.__name__.replace("State", "").lower()
-                        )
-                        method = getattr(self, setmethod, None)
-                        if method:
-                            method(response)
-                    if callb:
-                        callb(self, response)
-                    if replies == 0:
-                        if response.seq_num in self.reply_queue:
-                            del self.reply_queue[response.seq_num]
-                        del self.message[response.seq_num]
-                        myevent.set()
-                else:
-                    del self.message[response.seq_num]
-            elif isinstance(response, Acknowledgement):
+        request_id = (header.source_id, header.seq_num)
+        if request_id in self.message:
+            sent = self.sent_at.pop(request_id, None)
+            if sent is not None:
+                self.update_rtt(self.loop.time() - sent)
+            response_type, myevent, callb = self.message[request_id]
+            if issubclass(header.msg_class, response_type):
+                response = header.message
+                replies = 0
+                if self.reply_queue.get(request_id, None):
+                    self.reply_queue[request_id] -= 1
+                    replies = self.reply_queue[request_id]
+                if "State" in response.__class__.__name__:
+                    setmethod = (
+                        "resp_set_"
+                        + response.__class__.__name__.replace("State", "").lower()
+                    )
+                    method = getattr(self, setmethod, None)
+                    if method:
+                        method(response)
+                if callb:
+                    callb(self, response)
+                if replies == 0:
+                    if request_id in self.reply_queue:
+                        del self.reply_queue[request_id]
+                    del self.message[request_id]
+                    _wake(myevent)
+            elif header.msg_class is Acknowledgement:
                 pass
             else:
-                del self.message[response.seq_num]
+                # e.g. StateUnhandled, the request will not be answered
+                self.fail_request(request_id)
         elif self.default_callb:
-            self.default_callb(response)
+            self.default_callb(header.message)
 
     def register(self):
         """Proxy method to register the device with the parent."""
@@ -268,6 +1011,7 @@ class Device(aio.DatagramProtocol):
 
     def cleanup(self):
         """Method to call to cleanly terminate the connection to the device."""
+        self.sender.clear()
         if self.transport:
             self.transport.close()
             self.transport = None
@@ -293,8 +1037,7 @@ class Device(aio.DatagramProtocol):
         sent_msg_count = 0
         sleep_interval = 0.05
         while sent_msg_count < num_repeats:
-            if self.transport:
-                self.transport.sendto(msg.packed_message)
+            self.send_message(msg)
             sent_msg_count += 1
             await aio.sleep(
                 sleep_interval
@@ -325,15 +1068,37 @@ class Device(aio.DatagramProtocol):
             ack_requested=False,
             response_requested=False,
         )
+        key = self.write_key(msg) if self.coalesce else None
+        if key is not None:
+            self.replace_write(key)
         _create_background_task(self.fire_sending(msg, num_repeats))
         return True
 
+    def send_request(self, msg, timeout_secs=None, max_attempts=None):
+        """Method used to send a registered request, resent until answered.
+
+        The message is sent right away, then the retry scheduler shared by the
+        devices resends it every timeout_secs until it is answered. After
+        max_attempts, the request callback is called with None and the device
+        is unregistered.
+
+            :param msg: The message to send, registered in self.message
+            :type msg: aiolifx.Message
+            :param timeout_secs: Number of seconds to wait for a response or ack. By
+                                 default, see retransmit_timeout.
+            :type timeout_secs: int
+            :param max_attempts: .
+            :type max_attempts: int
+        """
+        if max_attempts is None:
+            max_attempts = self.retry_count
+        retry_scheduler(self.loop).schedule(self, msg, timeout_secs, max_attempts)
+
     async def try_sending(self, msg, timeout_secs, max_attempts):
         """Coroutine used to send message to the device when a response or ack is needed.
 
-        This coroutine will try to send up to max_attempts time the message, waiting timeout_secs
-        for an answer. If no answer is received, it will consider that the device is no longer
-        accessible and will unregister it.
+        This coroutine sends the message through send_request and returns once it has
+        been answered, or the device considered no longer accessible.
 
             :param msg: The message to send
             :type msg: aiolifx.Message
@@ -344,33 +1109,13 @@ class Device(aio.DatagramProtocol):
             :returns: a coroutine to be scheduled
             :rtype: coroutine
         """
-        if timeout_secs is None:
-            timeout_secs = self.timeout
-        if max_attempts is None:
-            max_attempts = self.retry_count
-
-        attempts = 0
-        while attempts < max_attempts:
-            if msg.seq_num not in self.message:
-                return
-            event = aio.Event()
-            self.message[msg.seq_num][1] = event
-            attempts += 1
-            if self.transport:
-                self.transport.sendto(msg.packed_message)
-            try:
-                async with asyncio_timeout(timeout_secs):
-                    await event.wait()
-                break
-            except TimeoutError:
-                if attempts >= max_attempts:
-                    if msg.seq_num in self.message:
-                        callb = self.message[msg.seq_num][2]
-                        if callb:
-                            callb(self, None)
-                        del self.message[msg.seq_num]
-                    # It's dead Jim
-                    self.unregister()
+        request_id = (msg.source_id, msg.seq_num)
+        if request_id not in self.message:
+            return
+        waiter = self.loop.create_future()
+        self.message[request_id][1] = waiter
+        self.send_request(msg, timeout_secs, max_attempts)
+        await waiter
 
     # Usually used for Set messages
     def req_with_ack(
@@ -388,19 +1133,13 @@ class Device(aio.DatagramProtocol):
         :type timeout_secs: int
         :param max_attempts: .
         :type max_attempts: int
-        :returns: True
+        :returns: True, or False if too many requests are in flight
         :rtype: bool
         """
-        msg = msg_type(
-            self.mac_addr,
-            self.source_id,
-            seq_num=self.seq_next(),
-            payload=payload,
-            ack_requested=True,
-            response_requested=False,
-        )
-        self.message[msg.seq_num] = [Acknowledgement, None, callb]
-        _create_background_task(self.try_sending(msg, timeout_secs, max_attempts))
+        msg = self.new_request(msg_type, Acknowledgement, payload, True, False, callb)
+        if msg is None:
+            return False
+        self.send_request(msg, timeout_secs, max_attempts)
         return True
 
     # Usually used for Get messages, or for state confirmation after Set (hence the optional payload)
@@ -427,24 +1166,15 @@ class Device(aio.DatagramProtocol):
         :type timeout_secs: int
         :param max_attempts: .
         :type max_attempts: int
-        :returns: True
+        :returns: True, or False if too many requests are in flight
         :rtype: bool
         """
-        replies = payload.pop("replies", None)
-
-        msg = msg_type(
-            self.mac_addr,
-            self.source_id,
-            seq_num=self.seq_next(),
-            payload=payload,
-            ack_requested=False,
-            response_requested=True,
-        )
-
-        self.message[msg.seq_num] = [response_type, None, callb]
-        if replies is not None:
-            self.reply_queue[msg.seq_num] = replies
-        _create_background_task(self.try_sending(msg, timeout_secs, max_attempts))
+        if self.join_request(msg_type, response_type, payload, callb):
+            return True
+        msg = self.new_request(msg_type, response_type, payload, False, True, callb)
+        if msg is None:
+            return False
+        self.send_request(msg, timeout_secs, max_attempts)
         return True
 
     # Not currently implemented, although the LIFX LAN protocol supports this kind of workflow natively
@@ -469,20 +1199,151 @@ class Device(aio.DatagramProtocol):
         :type timeout_secs: int
         :param max_attempts: .
         :type max_attempts: int
-        :returns: True
+        :returns: True, or False if too many requests are in flight
         :rtype: bool
         """
-        msg = msg_type(
-            self.mac_addr,
-            self.source_id,
-            seq_num=self.seq_next(),
-            payload=payload,
+        msg = self.new_request(msg_type, response_type, payload, True, True, callb)
+        if msg is None:
+            return False
+        self.send_request(msg, timeout_secs, max_attempts)
+        return True
+
+    async def async_request(
+        self,
+        msg_type,
+        response_type,
+        payload={},
+        ack_requested=False,
+        response_requested=True,
+        callb=None,
+        timeout_secs=None,
+        max_attempts=None,
+    ):
+        """Coroutine sending a message and returning the answer of the device.
+
+        The request is tracked like the ones of req_with_ack/req_with_resp, but its
+        completion is a single Future resolved by datagram_received, or by the
+        retry scheduler when the device does not answer. Like with req_with_resp, an
+        identical Get already in flight is shared, see join_request.
+
+            :param msg_type: The type of the message to send, a subclass of aiolifx.Message
+            :type msg_type: class
+            :param response_type: The type of the answer to expect, a subclass of aiolifx.Message
+            :type response_type: class
+            :param payload: value to use when instantiating msg_type. A "replies" key
+                            sets how many answers are expected.
+            :type payload: dict
+            :param ack_requested: Whether to request an ack
+            :type ack_requested: bool
+            :param response_requested: Whether to request a response
+            :type response_requested: bool
+            :param callb: A callback also executed for each answer, or with None on failure
+            :type callb: callable
+            :param timeout_secs: Number of seconds to wait for each attempt
+            :type timeout_secs: int
+            :param max_attempts: .
+            :type max_attempts: int
+            :returns: The answer, the list of answers when replies is set, or None
+                      if the device did not answer or the write was replaced.
+            :rtype: aiolifx.Message or list
+        """
+        replies = payload.get("replies", None)
+        answers = []
+
+        def collect(device, response):
+            if response:  # Not None, nor REPLACED
+                answers.append(response)
+            if callb:
+                callb(device, response)
+
+        future = self.loop.create_future()
+        if response_requested and not ack_requested:
+            if self.join_request(msg_type, response_type, payload, collect, future):
+                await future
+                return answers[0] if answers else None
+        msg = self.new_request(
+            msg_type,
+            response_type,
+            payload,
+            ack_requested,
+            response_requested,
+            collect,
+            future,
+        )
+        if msg is None:
+            return None
+        request_id = (msg.source_id, msg.seq_num)
+
+        try:
+            self.send_request(msg, timeout_secs, max_attempts)
+            await future
+        finally:
+            if self.message.get(request_id, [None, None])[1] is future:
+                # Cancelled, the callers that joined the request get None
+                self.fail_request(request_id)
+
+        if not answers:
+            return None
+        if replies is None:
+            return answers[0]
+        return answers
+
+    async def async_req_with_ack(
+        self, msg_type, payload, callb=None, timeout_secs=None, max_attempts=None
+    ):
+        """Coroutine version of req_with_ack, returns the Acknowledgement or None."""
+        return await self.async_request(
+            msg_type,
+            Acknowledgement,
+            payload,
             ack_requested=True,
+            response_requested=False,
+            callb=callb,
+            timeout_secs=timeout_secs,
+            max_attempts=max_attempts,
+        )
+
+    async def async_req_with_resp(
+        self,
+        msg_type,
+        response_type,
+        payload={},
+        callb=None,
+        timeout_secs=None,
+        max_attempts=None,
+    ):
+        """Coroutine version of req_with_resp, returns the response(s) or None."""
+        return await self.async_request(
+            msg_type,
+            response_type,
+            payload,
+            ack_requested=False,
             response_requested=True,
+            callb=callb,
+            timeout_secs=timeout_secs,
+            max_attempts=max_attempts,
+        )
+
+    async def async_req_with_ack_resp(
+        self,
+        msg_type,
+        response_type,
+        payload,
+        callb=None,
+        timeout_secs=None,
+        max_attempts=None,
+    ):
+        """Coroutine version of req_with_ack_resp, returns the response or None."""
+        return await self.async_request(
+            msg_type,
+            response_type,
+            payload,
+            ack_requested=True,
+            response_requested=True,
+            callb=callb,
+            timeout_secs=timeout_secs,
+            max_attempts=max_attempts,
         )
-        self.message[msg.seq_num] = [response_type, None, callb]
-        _create_background_task(self.try_sending(msg, timeout_secs, max_attempts))
-        return True
 
     #
     #                            Attribute Methods
@@ -510,6 +1371,15 @@ class Device(aio.DatagramProtocol):
             response = self.req_with_resp(GetLabel, StateLabel, callb=mycallb)
         return self.label
 
+    async def async_get_label(self):
+        """Coroutine requesting the label from the device
+
+        :returns: The label, None if the device did not answer
+        :rtype: str
+        """
+        if await self.async_req_with_resp(GetLabel, StateLabel):
+            return self.label
+
     def set_label(self, value, callb=None):
         """Convenience method to set the label of the device
 
@@ -634,6 +1504,15 @@ class Device(aio.DatagramProtocol):
             response = self.req_with_resp(GetPower, StatePower, callb=callb)
         return self.power_level
 
+    async def async_get_power(self):
+        """Coroutine requesting the power status from the device
+
+        :returns: The power level, None if the device did not answer
+        :rtype: int
+        """
+        if await self.async_req_with_resp(GetPower, StatePower):
+            return self.power_level
+
     def set_power(self, value, callb=None, rapid=False):
         """Convenience method to set the power status of the device
 
@@ -815,6 +1694,14 @@ class Device(aio.DatagramProtocol):
             response = self.req_with_resp(GetVersion, StateVersion, callb=mycallb)
         return (self.host_firmware_version, self.host_firmware_build_timestamp)
 
+    async def async_get_version(self):
+        """Coroutine requesting the version from the device
+
+        :returns: The StateVersion response, None if the device did not answer
+        :rtype: StateVersion
+        """
+        return await self.async_req_with_resp(GetVersion, StateVersion)
+
     def resp_set_version(self, resp):
         """Default callback for get_version"""
         if resp:
@@ -933,8 +1820,10 @@ class Light(Device):
         mac_addr = mac_addr.lower()
         super(Light, self).__init__(loop, mac_addr, ip_addr, port, parent)
         self.color = None
-        self.color_zones = None
+        self.color_zones = None  # List of the zone colours, None for the unknown ones
         self.zones_count = 1
+        # When True, color_zones is an HSBKZones keeping the colours packed
+        self.packed_zones = False
         self.infrared_brightness = None
         self.hev_cycle = None
         self.hev_cycle_configuration = None
@@ -973,6 +1862,15 @@ class Light(Device):
             response = self.req_with_resp(LightGetPower, LightStatePower, callb=callb)
         return self.power_level
 
+    async def async_get_power(self):
+        """Coroutine requesting the power status from the device
+
+        :returns: The power level, None if the device did not answer
+        :rtype: int
+        """
+        if await self.async_req_with_resp(LightGetPower, LightStatePower):
+            return self.power_level
+
     def set_power(self, value, callb=None, duration=0, rapid=False):
         """Convenience method to set the power status of the device
 
@@ -1018,6 +1916,20 @@ class Light(Device):
             if callb:
                 callb(self, None)
 
+    async def async_set_power(self, value, duration=0):
+        """Coroutine setting the power status of the device, see set_power
+
+        :returns: True if the device acknowledged the change
+        :rtype: bool
+        """
+        myvalue = MAX_UNSIGNED_16_BIT_INTEGER_VALUE if value in [True, 1, "on"] else 0
+        ack = await self.async_req_with_ack(
+            LightSetPower, {"power_level": myvalue, "duration": duration}
+        )
+        if ack:
+            self.resp_set_lightpower(None, power_level=myvalue)
+        return ack is not None
+
     # Here lightpower because LightStatePower message will give lightpower
     def resp_set_lightpower(self, resp, power_level=None):
         """Default callback for set_power"""
@@ -1044,6 +1956,15 @@ class Light(Device):
         response = self.req_with_resp(LightGet, LightState, callb=callb)
         return self.color
 
+    async def async_get_color(self):
+        """Coroutine requesting the colour status from the device
+
+        :returns: The colour, None if the device did not answer
+        :rtype: tuple
+        """
+        if await self.async_req_with_resp(LightGet, LightState):
+            return self.color
+
     # color is [Hue, Saturation, Brightness, Kelvin], duration in ms
     def set_color(self, value, callb=None, duration=0, rapid=False):
         """Convenience method to set the colour status of the device
@@ -1084,6 +2005,19 @@ class Light(Device):
             # except WorkflowException as e:
             # print(e)
 
+    async def async_set_color(self, value, duration=0):
+        """Coroutine setting the colour status of the device, see set_color
+
+        :returns: True if the device acknowledged the change
+        :rtype: bool
+        """
+        ack = await self.async_req_with_ack(
+            LightSetColor, {"color": value, "duration": duration}
+        )
+        if ack:
+            self.resp_set_light(None, color=value)
+        return ack is not None
+
     # Here light because LightState message will give light
     def resp_set_light(self, resp, color=None):
         """Default callback for set_color"""
@@ -1094,6 +2028,35 @@ class Light(Device):
             self.color = resp.color
             self.label = resp.label.decode().replace("\x00", "")
 
+    async def refresh(self):
+        """Coroutine requesting the whole state of the light at once.
+
+        All the requests are sent together instead of one after the other. A single
+        LightState gives the power, colour and label. Version and firmware, which do
+        not change, are only requested when not cached yet.
+
+        :returns: True once the light is populated, False if some answers are missing
+        :rtype: bool
+        """
+        requests = [
+            (LightGet, LightState),
+            (GetLocation, StateLocation),
+            (GetGroup, StateGroup),
+        ]
+        if self.vendor is None:
+            requests.append((GetVersion, StateVersion))
+        if self.host_firmware_version is None:
+            requests.append((GetHostFirmware, StateHostFirmware))
+        if self.wifi_firmware_version is None:
+            requests.append((GetWifiFirmware, StateWifiFirmware))
+        answers = await aio.gather(
+            *(
+                self.async_req_with_resp(msg_type, response_type)
+                for msg_type, response_type in requests
+            )
+        )
+        return None not in answers
+
     # Multizone
     def get_all_color_zones(self, zones_count=None, callb=None):
         """
@@ -1124,7 +2087,7 @@ class Light(Device):
         end_index = 255
         if zones_count is not None and self.zones_count == 1:
             self.zones_count = zones_count
-            self.color_zones = [None] * zones_count
+            self.color_zones = self.new_color_zones(zones_count)
 
         if self.zones_count > 1:
             end_index = self.zones_count - 1
@@ -1216,6 +2179,32 @@ class Light(Device):
             else:
                 self.req_with_ack(MultiZoneSetColorZones, args, callb=mycallb)
 
+    def new_color_zones(self, count):
+        """Method to return the colours of count zones, none of them known yet.
+
+        :param count: Number of zones
+        :type count: int
+        :returns: A list of None, or an HSBKZones when self.packed_zones is set
+        :rtype: list
+        """
+        if self.packed_zones:
+            return HSBKZones(count)
+        return [None] * count
+
+    def update_color_zones(self, start, colors):
+        """Method to set the colours of the zones from start on.
+
+        :param start: Index of the first zone
+        :type start: int
+        :param colors: The colours received
+        :type colors: HSBKColors or list
+        """
+        if isinstance(self.color_zones, HSBKZones):
+            self.color_zones.update(start, colors)
+        else:
+            for index, color in enumerate(colors):
+                self.color_zones[start + index] = color
+
     # A multi-zone MultiZoneGetColorZones returns MultiZoneStateMultiZone -> multizonemultizone
     def resp_set_multizonemultizone(self, resp, args=None):
         """Default callback for get-color_zones/set_color_zones"""
@@ -1224,20 +2213,20 @@ class Light(Device):
                 for i in range(args["start_index"], args["end_index"] + 1):
                     self.color_zones[i] = args["color"]
         elif resp:
-            if resp.seq_num in self.reply_queue:
-                if self.reply_queue[resp.seq_num] == 31:
+            request_id = (resp.source_id, resp.seq_num)
+            if request_id in self.reply_queue:
+                if self.reply_queue[request_id] == 31:
                     actual_replies = max(1, ceil(resp.count / 8))
-                    self.reply_queue[resp.seq_num] = actual_replies
+                    self.reply_queue[request_id] = actual_replies
 
             if self.zones_count == 1:
                 self.zones_count = resp.count
             if self.color_zones is None:
-                self.color_zones = [None] * resp.count
+                self.color_zones = self.new_color_zones(resp.count)
 
-            for index, color in enumerate(resp.color):
-                if index + resp.index >= resp.count:
-                    break
-                self.color_zones[index + resp.index] = color
+            self.update_color_zones(
+                resp.index, resp.color[: max(0, resp.count - resp.index)]
+            )
 
     def get_multizone_effect(self, callb=None):
         """Convenience method to get the currently running firmware effect on the device.
@@ -1341,7 +2330,7 @@ class Light(Device):
         """
         if zones_count is not None and self.zones_count == 1:
             self.zones_count = zones_count
-            self.color_zones = [None] * zones_count
+            self.color_zones = self.new_color_zones(zones_count)
 
         args = {}
         if self.zones_count > 1:
@@ -1354,6 +2343,29 @@ class Light(Device):
             callb=callb,
         )
 
+    async def async_get_extended_color_zones(self, zones_count=None):
+        """Coroutine requesting the state of all zones of a multizone device,
+        see get_extended_color_zones
+
+        :returns: The colour of each zone, None if the device did not answer
+        :rtype: list
+        """
+        if zones_count is not None and self.zones_count == 1:
+            self.zones_count = zones_count
+            self.color_zones = self.new_color_zones(zones_count)
+        if self.zones_count == 1:
+            # The first answer tells how many zones, hence answers, to expect
+            if not await self.async_req_with_resp(
+                MultiZoneGetExtendedColorZones, MultiZoneStateExtendedColorZones
+            ):
+                return None
+
+        args = {"replies": max(1, ceil(self.zones_count / 82))}
+        if await self.async_req_with_resp(
+            MultiZoneGetExtendedColorZones, MultiZoneStateExtendedColorZones, args
+        ):
+            return self.color_zones
+
     def set_extended_color_zones(
         self,
         colors,
@@ -1378,7 +2390,8 @@ class Light(Device):
         This method will automatically send multiple messages if the target device has more
         than 82 zones, which is the limit for a single message.
 
-        :param colors List of color dictionaries with HSBK keys
+        :param colors List of color dictionaries with HSBK keys, or a (N, 4) uint16
+                      NumPy array (see hsbk_array)
         :type colors List[dict[str, int]]
         :param colors_count How many color values in the color list to apply to the device
         :type colors_count int
@@ -1417,13 +2430,13 @@ class Light(Device):
         if resp:
             if self.zones_count == 1:
                 self.zones_count = resp.zones_count
-                self.color_zones = [None] * resp.zones_count
+                self.color_zones = self.new_color_zones(resp.zones_count)
                 return self.get_extended_color_zones()
 
-            for index, color in enumerate(resp.colors):
-                if index + resp.zone_index >= resp.zones_count:
-                    break
-                self.color_zones[index + resp.zone_index] = color
+            self.update_color_zones(
+                resp.zone_index,
+                resp.colors[: max(0, resp.zones_count - resp.zone_index)],
+            )
 
     # value should be a dictionary with the the following keys: transient, color, period, cycles, skew_ratio, waveform
     def set_waveform(self, value, callb=None, rapid=False):
@@ -1792,7 +2805,8 @@ class Light(Device):
         :type width: int
         :param duration: how long in seconds to transition to the new colors
         :type duration: int
-        :param colors: up to 64 color tuples to apply to the target zones
+        :param colors: up to 64 color tuples to apply to the target zones, or
+                       a (N, 4) uint16 NumPy array (see hsbk_array)
         :type colors: list[tuple[int, float, float, int]]
         :rtype: None
         """
@@ -1803,8 +2817,8 @@ class Light(Device):
             width = self.tile_device_width
 
         if len(colors) < 64:
-            for _ in range(64 - len(colors)):
-                colors.append((0, 0, 0, 3500))
+            colors = [tuple(color) for color in colors]
+            colors += [(0, 0, 0, 3500)] * (64 - len(colors))
 
         if len(colors) > 64:
             colors = colors[:64]
@@ -2199,6 +3213,223 @@ class Light(Device):
         return s
 
 
+class SharedSocket(aio.DatagramProtocol):
+    """A single UDP socket used to talk to many devices.
+
+    Instead of an endpoint each, the attached devices get a SharedSocketTransport
+    sending to their address through this socket. The replies are handed to the
+    device matching their target MAC address, which then matches them to its
+    requests by source id and sequence.
+
+        :param loop: The asyncio loop being used
+        :type loop: asyncio.AbstractEventLoop
+    """
+
+    def __init__(self, loop):
+        self.loop = loop
+        self.transport = None
+        self.task = None
+        self.devices = {}  # Attached devices indexed by mac addresses
+        self.waiting = []  # (device, addr) attached before the socket is ready
+        self.paused = False
+
+    def start(self, family=socket.AF_INET, listen_ip=None, listen_port=0):
+        """Start the socket task."""
+        local_addr = None
+        if listen_ip is not None:
+            local_addr = (listen_ip, listen_port)
+        coro = self.loop.create_datagram_endpoint(
+            lambda: self, family=family, local_addr=local_addr
+        )
+
+        self.task = aio.create_task(coro)
+        return self.task
+
+    def connection_made(self, transport):
+        """Method run when the socket is ready"""
+        self.transport = transport
+        waiting, self.waiting = self.waiting, []
+        for device, addr in waiting:
+            self.attach(device, addr)
+
+    def connection_lost(self, exc):
+        self.transport = None
+
+    def pause_writing(self):
+        """Method run when the socket buffer is full, pausing every device."""
+        self.paused = True
+        for device in list(self.devices.values()):
+            device.pause_writing()
+
+    def resume_writing(self):
+        """Method run when the socket buffer has drained."""
+        self.paused = False
+        for device in list(self.devices.values()):
+            if self.paused:
+                break  # Full again
+            device.resume_writing()
+
+    def error_received(self, exc):
+        """Method run when a datagram could not be delivered, handed over to every device.
+
+        The socket is not connected, so the device the datagram was for is not known.
+        Like with a socket each, the pending requests fail instead of timing out.
+        """
+        _LOGGER.debug("Shared socket error received: %s", exc)
+        for device in list(self.devices.values()):
+            device.error_received(exc)
+
+    def datagram_received(self, data, addr):
+        """Method run when data is received, handed over to the target device.
+
+        :param data: raw data
+        :type data: bytestring
+        :param addr: sender IP address 2-tuple for IPv4, 4-tuple for IPv6
+        :type addr: tuple
+        """
+        device = self.devices.get(unpack_lifx_header(data).target_addr)
+        if device is not None:
+            device.datagram_received(data, addr)
+
+    def attach(self, device, addr):
+        """Method to connect a device through the socket.
+
+        :param device: The device
+        :type device: Device
+        :param addr: The device address, (ip, port)
+        :type addr: tuple
+        """
+        if self.transport is None:
+            self.waiting.append((device, addr))
+            return
+        self.devices[device.mac_addr] = device
+        device.connection_made(SharedSocketTransport(self, device, addr))
+        if self.paused:
+            device.pause_writing()
+
+    def detach(self, device):
+        """Method to disconnect a device from the socket."""
+        if self.devices.get(device.mac_addr) is device:
+            del self.devices[device.mac_addr]
+
+    def cleanup(self):
+        """Method to call to cleanly close the socket."""
+        if self.transport:
+            self.transport.close()
+            self.transport = None
+        if self.task:
+            self.task.cancel()
+            self.task = None
+        self.devices = {}
+        self.waiting = []
+
+
+class SharedSocketTransport:
+    """Transport of a device attached to a SharedSocket.
+
+    It has the parts of asyncio.DatagramTransport the devices use.
+    """
+
+    def __init__(self, shared, device, addr):
+        self.shared = shared
+        self.device = device
+        self.addr = addr
+        self.closed = False
+
+    def sendto(self, data, addr=None):
+        if not self.is_closing():
+            self.shared.transport.sendto(data, addr or self.addr)
+
+    def is_closing(self):
+        return (
+            self.closed
+            or self.shared.transport is None
+            or self.shared.transport.is_closing()
+        )
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.shared.detach(self.device)
+
+    def get_extra_info(self, name, default=None):
+        if name == "peername":
+            return self.addr
+        if self.shared.transport is None:
+            return default
+        return self.shared.transport.get_extra_info(name, default)
+
+
+class DiscoveryEvent:
+    """A change of the devices known to LifxDiscovery.
+
+    :param kind: One of DEVICE_DISCOVERED, DEVICE_REDISCOVERED, DEVICE_REGISTERED
+                 or DEVICE_UNREGISTERED
+    :type kind: str
+    :param light: The device
+    :type light: Light
+    """
+
+    def __init__(self, kind, light):
+        self.kind = kind
+        self.light = light
+
+    def __repr__(self):
+        return f"DiscoveryEvent({self.kind!r}, {self.light.mac_addr!r})"
+
+
+class DiscoveryEvents:
+    """Async iterator over the DiscoveryEvent of a LifxDiscovery, see LifxDiscovery.events.
+
+    The events wait in a queue of at most maxsize. The discovery cannot wait for a slow
+    subscriber, so when the queue is full the oldest event is dropped and counted in dropped.
+    The iteration ends when the subscription is closed, or the discovery cleaned up.
+
+    :param discovery: The discovery sending the events
+    :type discovery: LifxDiscovery
+    :param maxsize: How many events can wait, 0 for no limit
+    :type maxsize: int
+    """
+
+    def __init__(self, discovery, maxsize):
+        self.discovery = discovery
+        self.queue = aio.Queue(maxsize)
+        self.dropped = 0
+        self.closed = False
+
+    def put(self, event):
+        """Method to queue an event."""
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+    def close(self):
+        """Method to stop receiving events, those already queued are still delivered."""
+        if not self.closed:
+            self.closed = True
+            self.discovery.subscribers.discard(self)
+            if not self.queue.full():
+                self.queue.put_nowait(None)  # Wakes up __anext__
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.closed and self.queue.empty():
+            raise StopAsyncIteration
+        event = await self.queue.get()
+        if event is None:
+            raise StopAsyncIteration
+        return event
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.close()
+
+
 class LifxDiscovery(aio.DatagramProtocol):
     """UDP broadcast discovery for  Lifx device.
 
@@ -2208,6 +3439,23 @@ class LifxDiscovery(aio.DatagramProtocol):
     by that amount. When discovery_countdown is <= 0, discovery is triggered. To hasten the process, one can set
     discovery_countdown = 0.
 
+    At start, and whenever a device appears or is lost, a burst of DISCOVERY_BURST broadcasts is sent,
+    DISCOVERY_BURST_STEP seconds apart, so that a lost reply does not hide a device for long. The burst
+    stops early when a broadcast finds no new device. The delay between broadcasts then doubles each
+    time, up to discovery_interval.
+
+    With a cache_file, the devices known from the previous run are registered as soon as discovery
+    starts, then refreshed in the background. Those that do not answer are forgotten. The cache is
+    saved when the registered devices change, and on cleanup.
+
+    Where broadcasts are filtered, sweep_networks lists networks, in CIDR notation, whose every
+    address is also sent the discovery message. A sweep goes through them at sweep_rate addresses
+    per second, in the background, and is repeated every discovery_interval seconds. The replies
+    are handled like those to the broadcast.
+
+    Besides the parent, any number of subscribers can follow the devices found and lost with
+    events(), as in "async for event in discovery.events()".
+
         :param parent: Parent object to register/unregister discovered device
         :type parent: object
         :param loop: The asyncio loop being used
@@ -2218,6 +3466,16 @@ class LifxDiscovery(aio.DatagramProtocol):
         :type discovery_interval: int
         :param discovery_step: How often, in seconds, will the discovery process check if it is time to broadcast
         :type discovery_step: int
+        :param shared_socket: Whether the devices found share one socket (see SharedSocket),
+                              instead of opening one each
+        :type shared_socket: bool
+        :param cache_file: Path of the JSON file caching the devices found, see DeviceCache
+        :type cache_file: str
+        :param sweep_networks: IPv4 networks to probe address by address, e.g. ["192.168.4.0/22"],
+                               a /16 at most
+        :type sweep_networks: list
+        :param sweep_rate: How many addresses a sweep probes per second
+        :type sweep_rate: int
         :returns: an asyncio DatagramProtocol to handle communication with the device
         :rtype: DatagramProtocol
     """
@@ -2230,6 +3488,10 @@ class LifxDiscovery(aio.DatagramProtocol):
         discovery_interval=DISCOVERY_INTERVAL,
         discovery_step=DISCOVERY_STEP,
         broadcast_ip=UDP_BROADCAST_IP,
+        shared_socket=False,
+        cache_file=None,
+        sweep_networks=None,
+        sweep_rate=SWEEP_RATE,
     ):
         self.lights = {}  # Known devices indexed by mac addresses
         self.parent = parent  # Where to register new devices
@@ -2241,7 +3503,22 @@ class LifxDiscovery(aio.DatagramProtocol):
         self.discovery_interval = discovery_interval
         self.discovery_step = discovery_step
         self.discovery_countdown = 0
+        self.discovery_burst = DISCOVERY_BURST  # Broadcasts left in the burst
+        self.discovery_backoff = DISCOVERY_BURST_STEP
+        self.discovered = 0  # New devices since the last broadcast
         self.broadcast_ip = broadcast_ip
+        self.shared_socket = shared_socket
+        self.shared_sockets = {}  # SharedSocket indexed by address family
+        self.paused = False
+        self.cache = DeviceCache(cache_file) if cache_file else None
+        self.cache_timer = None
+        self.sweep_networks = [
+            sweep_network(network) for network in sweep_networks or ()
+        ]
+        self.sweep_rate = sweep_rate
+        self.sweep_task = None
+        self.sweep_due = 0  # Loop time of the next sweep
+        self.subscribers = set()  # DiscoveryEvents
 
     def start(self, listen_ip=LISTEN_IP, listen_port=0):
         """Start discovery task."""
@@ -2259,8 +3536,18 @@ class LifxDiscovery(aio.DatagramProtocol):
         sock = self.transport.get_extra_info("socket")
         sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
         sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+        if self.cache:
+            self.warm_start()
         self.loop.call_soon(self.discover)
 
+    def pause_writing(self):
+        """Method run when the socket buffer is full, delaying the discovery."""
+        self.paused = True
+
+    def resume_writing(self):
+        """Method run when the socket buffer has drained."""
+        self.paused = False
+
     def datagram_received(self, data, addr):
         """Method run when data is received from the devices
 
@@ -2273,29 +3560,29 @@ class LifxDiscovery(aio.DatagramProtocol):
             :param addr: sender IP address 2-tuple for IPv4, 4-tuple for IPv6
             :type addr: tuple
         """
-        response = unpack_lifx_message(data)
-        response.ip_addr = addr[0]
+        header = unpack_lifx_header(data)
 
-        mac_addr = response.target_addr
+        mac_addr = header.target_addr
         if mac_addr == BROADCAST_MAC:
             return
 
-        if (
-            type(response) == StateService and response.service == 1
-        ):  # only look for UDP services
+        if header.msg_class is StateService:
+            response = header.message
+            if response.service != 1:  # only look for UDP services
+                return
             # discovered
             remote_port = response.port
-        elif type(response) == LightState:
+        elif header.msg_class is LightState:
             # looks like the lights are volunteering LigthState after booting
+            response = header.message
             remote_port = UDP_BROADCAST_PORT
         else:
             return
+        response.ip_addr = addr[0]
 
         if self.ipv6prefix:
-            family = socket.AF_INET6
             remote_ip = mac_to_ipv6_linklocal(mac_addr, self.ipv6prefix)
         else:
-            family = socket.AF_INET
             remote_ip = response.ip_addr
 
         if mac_addr in self.lights:
@@ -2307,120 +3594,418 @@ class LifxDiscovery(aio.DatagramProtocol):
                 return
 
             light.cleanup()
+            moved = (light.ip_addr, light.port) != (remote_ip, remote_port)
             light.ip_addr = remote_ip
             light.port = remote_port
+            if moved:
+                self.emit(DEVICE_REDISCOVERED, light)
         else:
             # newly discovered
             light = Light(self.loop, mac_addr, remote_ip, remote_port, parent=self)
             self.lights[mac_addr] = light
+            self.discovered += 1
+            self.start_burst()
+            self.emit(DEVICE_DISCOVERED, light)
+
+        self.connect(light)
+
+    def connect(self, light):
+        """Method to open the connection to a light, at light.ip_addr and light.port.
+
+        :param light: The light
+        :type light: Light
+        :returns: The task opening the connection
+        :rtype: asyncio.Task
+        """
+        family = socket.AF_INET6 if self.ipv6prefix else socket.AF_INET
+        if self.shared_socket:
+            if family not in self.shared_sockets:
+                self.shared_sockets[family] = SharedSocket(self.loop)
+                self.shared_sockets[family].start(family=family)
+            self.shared_sockets[family].attach(light, (light.ip_addr, light.port))
+            return self.shared_sockets[family].task
 
         coro = self.loop.create_datagram_endpoint(
-            lambda: light, family=family, remote_addr=(remote_ip, remote_port)
+            lambda: light, family=family, remote_addr=(light.ip_addr, light.port)
         )
 
         light.task = aio.create_task(coro)
+        return light.task
+
+    def warm_start(self):
+        """Method to register the lights found in the cache, refreshed in the background."""
+        for record in self.cache.load():
+            mac_addr = record["mac_addr"]
+            if mac_addr in self.lights:
+                continue
+            light = Light(
+                self.loop, mac_addr, record["ip_addr"], record["port"], parent=self
+            )
+            DeviceCache.restore(light, record)
+            self.lights[mac_addr] = light
+            self.emit(DEVICE_DISCOVERED, light)
+            _create_background_task(self.revalidate(light, self.connect(light)))
+
+    async def revalidate(self, light, connecting):
+        """Coroutine refreshing a light found in the cache, forgotten if it does not answer.
+
+        :param light: The light
+        :type light: Light
+        :param connecting: The task opening its connection
+        :type connecting: asyncio.Task
+        """
+        try:
+            await connecting
+        except OSError as e:
+            _LOGGER.debug("%s: Cannot connect: %s", light.mac_addr, e)
+        else:
+            lastmsg = light.lastmsg
+            if await light.refresh() or light.lastmsg != lastmsg:
+                self.save_cache()
+                return
+        _LOGGER.debug("%s: Cached device not found, forgotten", light.mac_addr)
+        if self.lights.get(light.mac_addr) is light:
+            del self.lights[light.mac_addr]
+        light.cleanup()
+        if light.registered:
+            light.registered = False
+            self.unregister(light)
+        else:
+            self.save_cache()
+
+    def save_cache(self):
+        """Method to save the cache a little later, with the other changes meanwhile."""
+        if self.cache and self.cache_timer is None:
+            self.cache_timer = self.loop.call_later(CACHE_SAVE_DELAY, self.write_cache)
+
+    def write_cache(self):
+        """Method to save the registered lights in the cache right away."""
+        if self.cache_timer is not None:
+            self.cache_timer.cancel()
+            self.cache_timer = None
+        if self.cache:
+            self.cache.save(light for light in self.lights.values() if light.registered)
+
+    def discovery_message(self):
+        """Method to return the packed discovery message.
+
+        :returns: The GetService message, to send to UDP_BROADCAST_PORT
+        :rtype: bytes
+        """
+        msg = GetService(
+            BROADCAST_MAC,
+            self.source_id,
+            seq_num=0,
+            payload={},
+            ack_requested=False,
+            response_requested=True,
+        )
+        return msg.generate_packed_message()
 
     def discover(self):
         """Method to send a discovery message"""
         if self.transport:
-            if self.discovery_countdown <= 0:
-                self.discovery_countdown = self.discovery_interval
-                msg = GetService(
-                    BROADCAST_MAC,
-                    self.source_id,
-                    seq_num=0,
-                    payload={},
-                    ack_requested=False,
-                    response_requested=True,
-                )
+            if self.discovery_countdown <= 0 and not self.paused:
+                self.discovery_countdown = self.next_discovery_delay()
                 self.transport.sendto(
-                    msg.generate_packed_message(),
+                    self.discovery_message(),
                     (self.broadcast_ip, UDP_BROADCAST_PORT),
                 )
-            else:
-                self.discovery_countdown -= self.discovery_step
-            self.loop.call_later(self.discovery_step, self.discover)
+                if self.sweep_networks and self.loop.time() >= self.sweep_due:
+                    self.start_sweep()
+            # When paused, tried again at the next step
+            step = self.discovery_step
+            if 0 < self.discovery_countdown < step:
+                step = self.discovery_countdown
+            self.discovery_countdown -= step
+            self.loop.call_later(step, self.discover)
+
+    def start_sweep(self):
+        """Method to start sweeping sweep_networks, unless a sweep is going on.
+
+        :returns: The sweep task
+        :rtype: asyncio.Task
+        """
+        if self.sweep_task is None or self.sweep_task.done():
+            self.sweep_due = self.loop.time() + self.discovery_interval
+            self.sweep_task = aio.create_task(self.sweep())
+        return self.sweep_task
+
+    async def sweep(self):
+        """Coroutine sending the discovery message to every address of sweep_networks.
+
+        The messages are sent SWEEP_BATCH at a time, paced to sweep_rate per second, and
+        held while the socket buffer is full. The replies come back to datagram_received.
+        """
+        data = self.discovery_message()
+        pace = SWEEP_BATCH / self.sweep_rate
+        hosts = itertools.chain.from_iterable(
+            network.hosts() for network in self.sweep_networks
+        )
+        while True:
+            batch = list(itertools.islice(hosts, SWEEP_BATCH))
+            if not batch:
+                break
+            while self.paused:
+                await aio.sleep(pace)
+            if not self.transport:
+                return
+            for host in batch:
+                self.transport.sendto(data, (str(host), UDP_BROADCAST_PORT))
+            await aio.sleep(pace)
+
+    def next_discovery_delay(self):
+        """Method to return the delay until the next broadcast, when sending one.
+
+        :returns: Number of seconds
+        :rtype: float
+        """
+        if 0 < self.discovery_burst < DISCOVERY_BURST and not self.discovered:
+            self.discovery_burst = 0  # The last broadcast found nothing new
+        self.discovered = 0
+        if self.discovery_burst > 0:
+            self.discovery_burst -= 1
+            self.discovery_backoff = DISCOVERY_BURST_STEP
+        else:
+            self.discovery_backoff = min(
+                self.discovery_backoff * 2, self.discovery_interval
+            )
+        return self.discovery_backoff
+
+    def start_burst(self):
+        """Method to start a burst of broadcasts, unless one is going on."""
+        if self.discovery_burst == 0:
+            self.discovery_burst = DISCOVERY_BURST
+            self.discovery_countdown = min(
+                self.discovery_countdown, DISCOVERY_BURST_STEP
+            )
+
+    def events(self, maxsize=EVENT_QUEUE_SIZE):
+        """Method to subscribe to the changes of the devices.
+
+        :param maxsize: How many events can wait, the oldest are dropped beyond
+        :type maxsize: int
+        :returns: An async iterator of DiscoveryEvent, to close when done
+        :rtype: DiscoveryEvents
+        """
+        subscription = DiscoveryEvents(self, maxsize)
+        self.subscribers.add(subscription)
+        return subscription
+
+    def emit(self, kind, light):
+        """Method to send an event to the subscribers.
+
+        :param kind: The kind of DiscoveryEvent
+        :type kind: str
+        :param light: The device
+        :type light: Light
+        """
+        if self.subscribers:
+            event = DiscoveryEvent(kind, light)
+            for subscription in self.subscribers:
+                subscription.put(event)
 
     def register(self, alight):
         """Proxy method to register the device with the parent."""
+        self.save_cache()
+        self.emit(DEVICE_REGISTERED, alight)
         if self.parent:
             self.parent.register(alight)
 
     def unregister(self, alight):
         """Proxy method to unregister the device with the parent."""
+        self.start_burst()
+        self.save_cache()
+        self.emit(DEVICE_UNREGISTERED, alight)
         if self.parent:
             self.parent.unregister(alight)
 
     def cleanup(self):
         """Method to call to cleanly terminate the connection to the device."""
+        self.write_cache()
         if self.transport:
             self.transport.close()
             self.transport = None
         if self.task:
             self.task.cancel()
             self.task = None
+        if self.sweep_task:
+            self.sweep_task.cancel()
+            self.sweep_task = None
         for light in self.lights.values():
             light.cleanup()
         self.lights = {}
+        for shared in self.shared_sockets.values():
+            shared.cleanup()
+        self.shared_sockets = {}
+        for subscription in list(self.subscribers):
+            subscription.close()
 
 
-class LifxScan:
-    """Scan all network interfaces for any active bulb."""
+class ScanResult:
+    """What LifxScan found on a network interface.
 
-    def __init__(self, loop):
-        """Initialize the scanner."""
-        self.loop = loop
+    :param adapter: Name of the network interface
+    :type adapter: str
+    :param ip: IPv4 address of the interface
+    :type ip: str
+    """
 
-    async def scan(self, timeout=1):
-        """Return a list of local IP addresses on interfaces with LIFX bulbs."""
-        adapters = await self.loop.run_in_executor(None, ifaddr.get_adapters)
-        ips = [
-            ip.ip
-            for adapter in ifaddr.get_adapters()
-            for ip in adapter.ips
-            if ip.is_IPv4
-        ]
+    def __init__(self, adapter, ip):
+        self.adapter = adapter
+        self.ip = ip
+        self.devices = {}  # (ip address, port) of the devices seen, by mac address
 
-        if not ips:
-            return []
+    def __repr__(self):
+        return f"ScanResult({self.adapter!r}, {self.ip!r}, {self.devices!r})"
 
-        tasks = []
-        discoveries = []
-        for ip in ips:
-            manager = ScanManager(ip)
-            lifx_discovery = LifxDiscovery(self.loop, manager)
-            discoveries.append(lifx_discovery)
-            lifx_discovery.start(listen_ip=ip)
-            tasks.append(aio.create_task(manager.lifx_ip()))
 
-        (done, pending) = await aio.wait(tasks, timeout=timeout)
+class ScanProtocol(aio.DatagramProtocol):
+    """Socket broadcasting the discovery message from one interface for LifxScan.
 
-        for discovery in discoveries:
-            discovery.cleanup()
+    :param result: Where to record the devices answering
+    :type result: ScanResult
+    :param found: Called when a device answers
+    :type found: callable
+    """
 
-        for task in pending:
-            task.cancel()
+    def __init__(self, result, found):
+        self.result = result
+        self.found = found
 
-        return [task.result() for task in done]
+    def connection_made(self, transport):
+        sock = transport.get_extra_info("socket")
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
 
+    def datagram_received(self, data, addr):
+        header = unpack_lifx_header(data)
+        if header.msg_class is StateService and header.message.service == 1:
+            self.result.devices[header.target_addr] = (addr[0], header.message.port)
+            self.found()
 
-class ScanManager:
-    """Temporary manager for discovering any bulb."""
 
-    def __init__(self, ip):
-        """Initialize the manager."""
-        self._event = aio.Event()
-        self.ip = ip
+class LifxScan:
+    """Scan all network interfaces for any active bulb.
 
-    async def lifx_ip(self):
-        """Return our IP address when any device is discovered."""
-        await self._event.wait()
-        return self.ip
+    The interfaces are listed in an executor, and the list is kept for INTERFACE_CACHE_TTL
+    seconds. Concurrent scans with the same timeout share the same probe.
+    """
+
+    def __init__(self, loop):
+        """Initialize the scanner."""
+        self.loop = loop
+        self.source_id = random.randint(0, (2**32) - 1)
+        self.adapters = None  # (name, IPv4 address) of the network interfaces
+        self.adapters_expiry = 0
+        self.tasks = {}  # Probes running or done, by timeout and first_only
+
+    async def scan(self, timeout=1):
+        """Return a list of local IP addresses on interfaces with LIFX bulbs.
+
+        The scan ends as soon as a bulb answered on every interface.
+        """
+        results = await self.shared_probe(timeout, True)
+        return [result.ip for result in results if result.devices]
 
-    def register(self, bulb):
-        """Handle detected bulb."""
-        self._event.set()
+    async def scan_interfaces(self, timeout=1):
+        """Return what was found on each IPv4 interface, waiting for timeout.
 
-    def unregister(self, bulb):
-        """Handle disappearing bulb."""
-        pass
+        :param timeout: How long, in seconds, to wait for the bulbs to answer
+        :type timeout: float
+        :returns: One result per interface address
+        :rtype: list of ScanResult
+        """
+        return await self.shared_probe(timeout, False)
+
+    async def shared_probe(self, timeout, first_only):
+        """Coroutine running a probe, or joining the same probe if it is running.
+
+        :param timeout: How long, in seconds, to wait for the bulbs to answer
+        :type timeout: float
+        :param first_only: Whether to stop once a bulb answered on every interface
+        :type first_only: bool
+        :returns: One result per interface address
+        :rtype: list of ScanResult
+        """
+        key = (timeout, first_only)
+        task = self.tasks.get(key)
+        if task is None or task.done():
+            task = self.tasks[key] = aio.create_task(self.probe(timeout, first_only))
+        return await aio.shield(task)
+
+    async def interfaces(self):
+        """Return the IPv4 network interfaces, listed again once the cached list expires.
+
+        :returns: (name, IPv4 address) of the interfaces
+        :rtype: list
+        """
+        if self.adapters is None or self.loop.time() >= self.adapters_expiry:
+            adapters = await self.loop.run_in_executor(None, ifaddr.get_adapters)
+            self.adapters = [
+                (adapter.nice_name, ip.ip)
+                for adapter in adapters
+                for ip in adapter.ips
+                if ip.is_IPv4
+            ]
+            self.adapters_expiry = self.loop.time() + INTERFACE_CACHE_TTL
+        return self.adapters
+
+    async def probe(self, timeout, first_only=False):
+        """Coroutine broadcasting the discovery message from every interface.
+
+        It is sent at the start and again half way through, in case one is lost.
+
+        :param timeout: How long, in seconds, to wait for the bulbs to answer
+        :type timeout: float
+        :param first_only: Whether to stop once a bulb answered on every interface,
+                           instead of waiting for all the bulbs until timeout
+        :type first_only: bool
+        :returns: One result per interface address
+        :rtype: list of ScanResult
+        """
+        results = [ScanResult(name, ip) for name, ip in await self.interfaces()]
+        scanned = []
+        all_found = aio.Event()
+
+        def found():
+            if first_only and all(result.devices for result in scanned):
+                all_found.set()
+
+        endpoints = await aio.gather(
+            *[
+                self.loop.create_datagram_endpoint(
+                    partial(ScanProtocol, result, found), local_addr=(result.ip, 0)
+                )
+                for result in results
+            ],
+            return_exceptions=True,
+        )
+        transports = []
+        for result, endpoint in zip(results, endpoints):
+            if isinstance(endpoint, Exception):
+                _LOGGER.debug("Cannot scan from %s: %s", result.ip, endpoint)
+            else:
+                scanned.append(result)
+                transports.append(endpoint[0])
+        msg = GetService(
+            BROADCAST_MAC,
+            self.source_id,
+            seq_num=0,
+            payload={},
+            ack_requested=False,
+            response_requested=True,
+        )
+        data = msg.generate_packed_message()
+        try:
+            for _ in range(2 if transports else 0):
+                for transport in transports:
+                    transport.sendto(data, (UDP_BROADCAST_IP, UDP_BROADCAST_PORT))
+                try:
+                    await aio.wait_for(all_found.wait(), timeout / 2)
+                    break
+                except aio.TimeoutError:
+                    pass
+        finally:
+            for transport in transports:
+                transport.close()
+        return results
@@ -0,0 +1,83 @@
+import json
+import logging
+import os
+
+_LOGGER = logging.getLogger(__name__)
+
+# Device attributes kept in the cache, the first three are needed to reach it
+CACHED_ATTRIBUTES = (
+    "mac_addr",
+    "ip_addr",
+    "port",
+    "label",
+    "location",
+    "group",
+    "vendor",
+    "product",
+    "version",
+    "host_firmware_version",
+    "host_firmware_build_timestamp",
+    "wifi_firmware_version",
+    "wifi_firmware_build_timestamp",
+)
+
+
+class DeviceCache:
+    """A JSON file holding what is known of the devices, to start without discovery.
+
+    :param path: Path of the cache file
+    :type path: str
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def load(self):
+        """Read the devices saved in the cache.
+
+        A missing or unreadable cache is empty.
+
+        :returns: One dictionary per device, keyed by attribute name
+        :rtype: list
+        """
+        try:
+            with open(self.path) as cache_file:
+                records = json.load(cache_file)
+        except FileNotFoundError:
+            return []
+        except (OSError, ValueError) as e:
+            _LOGGER.warning("Ignoring device cache %s: %s", self.path, e)
+            return []
+        if not isinstance(records, list):
+            return []
+        return [
+            record
+            for record in records
+            if isinstance(record, dict)
+            and all(name in record for name in CACHED_ATTRIBUTES[:3])
+        ]
+
+    def save(self, devices):
+        """Replace the content of the cache with devices.
+
+        :param devices: The devices to save
+        :type devices: iterable
+        """
+        records = [
+            {name: getattr(device, name) for name in CACHED_ATTRIBUTES}
+            for device in devices
+        ]
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, "w") as cache_file:
+                json.dump(records, cache_file, indent=1)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            _LOGGER.warning("Could not save device cache %s: %s", self.path, e)
+
+    @staticmethod
+    def restore(device, record):
+        """Set the cached attributes of device from a loaded record."""
+        for name in CACHED_ATTRIBUTES[3:]:
+            if name in record:
+                setattr(device, name, record[name])
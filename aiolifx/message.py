@@ -4,14 +4,55 @@
 import struct
 import binascii
 import sys
+from collections.abc import Sequence
+from functools import lru_cache
+from itertools import chain
+
+try:
+    import numpy
+except ImportError:  # NumPy is optional, HSBK arrays are only available with it
+    numpy = None
 
 BROADCAST_MAC = "00:00:00:00:00:00"
 BROADCAST_SOURCE_ID = 0
 
 HEADER_SIZE_BYTES = 36
 
+# size, flags, source_id, target MAC (6 of 8 bytes), response flags, seq_num, message type
+HEADER_STRUCT = struct.Struct("<HHI6s8xBB8xH2x")
+# Header fields patched for each message: size and flags, then response flags and seq_num
+FRAME_STRUCT = struct.Struct("<HH")
+FRAME_ADDR_STRUCT = struct.Struct("<BB")
+FRAME_ADDR_OFFSET = 22
+
+HSBK_STRUCT = struct.Struct("<4H")
+
 
 class Message(object):
+    __slots__ = (
+        "size",
+        "origin",
+        "tagged",
+        "addressable",
+        "protocol",
+        "source_id",
+        "target_addr",
+        "ack_requested",
+        "response_requested",
+        "seq_num",
+        "message_type",
+        "header",
+        "payload",
+        "ip_addr",
+        "header_templates",
+        "_packed_message",
+    )
+
+    reserved = 0  # All reserved fields are zero
+
+    # ("label", attribute name) of the payload fields shown by __str__
+    payload_labels = ()
+
     def __init__(
         self,
         msg_type,
@@ -22,7 +63,6 @@ class Message(object):
         response_requested=False,
     ):
         # Frame
-        self.frame_format = ["<H", "<H", "<L"]
         self.size = None  # 16 bits/uint16
         self.origin = 0  # 2 bits/uint8, must be zero
         self.tagged = (
@@ -33,24 +73,23 @@ class Message(object):
         self.source_id = source_id  # 32 bits/uint32, unique ID set by client. If zero, broadcast reply requested. If non-zero, unicast reply requested.
 
         # Frame Address
-        self.frame_addr_format = ["<Q", "<BBBBBB", "<B", "<B"]
         self.target_addr = target_addr  # 64 bits/uint64, either single MAC address or all zeroes for broadcast.
-        self.reserved = 0  # 48 bits/uint8 x 6, all zero
-        self.reserved = 0  # 6 bits, all zero
         self.ack_requested = 1 if ack_requested else 0  # 1 bit/bool, 1 = yes
         self.response_requested = 1 if response_requested else 0  # 1 bit/bool, 1 = yes
         self.seq_num = seq_num  # 8 bits/uint8, wraparound
 
         # Protocol Header
-        self.protocol_header_format = ["<Q", "<H", "<H"]
-        self.reserved = 0  # 64 bits/uint64, all zero
         self.message_type = msg_type  # 16 bits/uint16
-        self.reserved = 0  # 16 bits/uint16, all zero
-
-        self.payload_fields = []  # tuples of ("label", value)
 
+        # HeaderTemplate by source id and message type of the sending device, if any
+        self.header_templates = None
         self._packed_message = None
 
+    @property
+    def payload_fields(self):
+        """tuples of ("label", value), only built for display"""
+        return [(label, getattr(self, name)) for label, name in self.payload_labels]
+
     @property
     def packed_message(self):
         if self._packed_message is None:
@@ -71,58 +110,42 @@ class Message(object):
     def get_header(self):
         if self.size == None:
             self.size = self.get_msg_size()
-        frame_addr = self.get_frame_addr()
-        frame = self.get_frame()
-        protocol_header = self.get_protocol_header()
-        header = frame + frame_addr + protocol_header
-        return header
+        return self.header_template().pack(self.size, *self.get_flags(), self.seq_num)
 
-    # Default: No payload unless method overridden
-    def get_payload(self):
-        return struct.pack("")
-
-    def get_frame(self):
-        size_format = self.frame_format[0]
-        flags_format = self.frame_format[1]
-        source_id_format = self.frame_format[2]
-        size = struct.pack(size_format, self.size)
-        flags = struct.pack(
-            flags_format,
+    # Same as get_header, but the header is written in buffer at offset
+    def pack_header_into(self, buffer, offset=0):
+        if self.size == None:
+            self.size = self.get_msg_size()
+        self.header_template().pack_into(
+            buffer, offset, self.size, *self.get_flags(), self.seq_num
+        )
+
+    # The device sending the message keeps its templates in header_templates, those of
+    # the other messages are not kept
+    def header_template(self):
+        if self.header_templates is None:
+            return HeaderTemplate(self.target_addr, self.source_id, self.message_type)
+        key = (self.source_id, self.message_type)
+        template = self.header_templates.get(key)
+        if template is None:
+            template = self.header_templates[key] = HeaderTemplate(
+                self.target_addr, self.source_id, self.message_type
+            )
+        return template
+
+    # Frame flags (origin, tagged, addressable, protocol) and response flags (ack, response)
+    def get_flags(self):
+        return (
             ((self.origin & 0b11) << 14)
             | ((self.tagged & 0b1) << 13)
             | ((self.addressable & 0b1) << 12)
             | (self.protocol & 0b111111111111),
+            ((self.ack_requested & 0b1) << 1) | (self.response_requested & 0b1),
         )
-        source_id = struct.pack(source_id_format, self.source_id)
-        frame = size + flags + source_id
-        return frame
-
-    def get_frame_addr(self):
-        mac_addr_format = self.frame_addr_format[0]
-        reserved_48_format = self.frame_addr_format[1]
-        response_flags_format = self.frame_addr_format[2]
-        seq_num_format = self.frame_addr_format[3]
-        mac_addr = struct.pack(mac_addr_format, convert_MAC_to_int(self.target_addr))
-        reserved_48 = struct.pack(reserved_48_format, *([self.reserved] * 6))
-        response_flags = struct.pack(
-            response_flags_format,
-            ((self.reserved & 0b111111) << 2)
-            | ((self.ack_requested & 0b1) << 1)
-            | (self.response_requested & 0b1),
-        )
-        seq_num = struct.pack(seq_num_format, self.seq_num)
-        frame_addr = mac_addr + reserved_48 + response_flags + seq_num
-        return frame_addr
-
-    def get_protocol_header(self):
-        reserved_64_format = self.protocol_header_format[0]
-        message_type_format = self.protocol_header_format[1]
-        reserved_16_format = self.protocol_header_format[2]
-        reserved_64 = struct.pack(reserved_64_format, self.reserved)
-        message_type = struct.pack(message_type_format, self.message_type)
-        reserved_16 = struct.pack(reserved_16_format, self.reserved)
-        protocol_header = reserved_64 + message_type + reserved_16
-        return protocol_header
+
+    # Default: No payload unless method overridden
+    def get_payload(self):
+        return b""
 
     def get_msg_size(self):
         payload_size_bytes = len(self.payload)
@@ -160,13 +183,297 @@ class Message(object):
         return s
 
 
-# reverses bytes for little endian, then converts to int
-def convert_MAC_to_int(addr):
-    reverse_bytes_str = addr.split(":")
-    reverse_bytes_str.reverse()
-    addr_str = "".join(reverse_bytes_str)
-    return int(addr_str, 16)
+# MAC addresses are converted once per device and direction, the caches are shared by
+# the encoder, the decoder and the discovery.
+MAC_CACHE_SIZE = 1024
+MAC_DELIMITERS = str.maketrans("", "", " .:-")
+
+
+# 6 bytes MAC address to its canonical aa:bb:cc:dd:ee:ff string
+@lru_cache(maxsize=MAC_CACHE_SIZE)
+def mac_to_str(mac_bytes):
+    return ":".join([("%02x" % b) for b in mac_bytes])
+
+
+# MAC address string, with or without delimiters, to its 6 bytes
+@lru_cache(maxsize=MAC_CACHE_SIZE)
+def mac_to_bytes(addr):
+    return bytes.fromhex(addr.translate(MAC_DELIMITERS))
+
+
+class HeaderTemplate(object):
+    """Pre-packed 36 bytes header for one target, source and message type.
+
+    Only the size, the flags and the sequence number change from one message
+    to the next, they are written over the template with pack_into.
+
+        :param target_addr: The MAC address of the target
+        :type target_addr: str
+        :param source_id: The source id of the sender
+        :type source_id: int
+        :param msg_type: The message type
+        :type msg_type: int
+    """
+
+    __slots__ = ("_header",)
+
+    def __init__(self, target_addr, source_id, msg_type):
+        self._header = bytearray(
+            HEADER_STRUCT.pack(
+                0,
+                0,
+                source_id,
+                mac_to_bytes(target_addr),
+                0,
+                0,
+                msg_type,
+            )
+        )
+
+    def pack(self, size, flags, response_flags, seq_num):
+        """Return the header of a message with the given size, flags and seq_num.
+
+        :param size: Size of the message, header included
+        :type size: int
+        :param flags: The origin, tagged, addressable and protocol bits
+        :type flags: int
+        :param response_flags: The ack and response required bits
+        :type response_flags: int
+        :param seq_num: The sequence number
+        :type seq_num: int
+        :returns: The packed header
+        :rtype: bytes
+        """
+        FRAME_STRUCT.pack_into(self._header, 0, size, flags)
+        FRAME_ADDR_STRUCT.pack_into(
+            self._header, FRAME_ADDR_OFFSET, response_flags, seq_num
+        )
+        return bytes(self._header)
+
+    def pack_into(self, buffer, offset, size, flags, response_flags, seq_num):
+        """Write the header of a message in buffer at offset, see pack."""
+        buffer[offset : offset + HEADER_SIZE_BYTES] = self._header
+        FRAME_STRUCT.pack_into(buffer, offset, size, flags)
+        FRAME_ADDR_STRUCT.pack_into(
+            buffer, offset + FRAME_ADDR_OFFSET, response_flags, seq_num
+        )
+
+
+def pack_messages(messages, buffer=None):
+    """Pack messages back to back in a single buffer.
+
+    The buffer is allocated once for the whole batch, or reused when one large
+    enough is provided. The views returned are only valid until the buffer is
+    used again.
+
+        :param messages: The messages to pack
+        :type messages: list
+        :param buffer: Buffer to pack the messages in
+        :type buffer: bytearray
+        :returns: One view of the buffer per message, in order
+        :rtype: list[memoryview]
+    """
+    total = 0
+    for msg in messages:
+        msg.payload = msg.get_payload()
+        total += HEADER_SIZE_BYTES + len(msg.payload)
+    if buffer is None or len(buffer) < total:
+        buffer = bytearray(total)
+    view = memoryview(buffer)
+    datagrams = []
+    offset = 0
+    for msg in messages:
+        end = offset + HEADER_SIZE_BYTES + len(msg.payload)
+        msg.pack_header_into(buffer, offset)
+        buffer[offset + HEADER_SIZE_BYTES : end] = msg.payload
+        datagrams.append(view[offset:end])
+        offset = end
+    return datagrams
+
+
+# Compiled payload layouts, keyed by the little endian format of the fixed part of the
+# payload and the number of HSBK colours (4 x uint16) appended to it.
+@lru_cache(maxsize=256)
+def payload_layout(fmt, colors=0):
+    return struct.Struct(fmt + "4H" * colors)
+
+
+# Flattens a sequence of HSBK tuples into the values expected by payload_layout
+def hsbk_values(colors):
+    return chain.from_iterable(colors)
+
+
+# Packs HSBK colours. Received colours and NumPy arrays are copied as is, anything
+# else is a sequence of HSBK tuples.
+def hsbk_bytes(colors):
+    if isinstance(colors, (HSBKColors, HSBKZones)):
+        return colors.packed()
+    if numpy is not None and isinstance(colors, numpy.ndarray):
+        return numpy.ascontiguousarray(colors, dtype="<u2").tobytes()
+    return payload_layout("<", len(colors)).pack(*hsbk_values(colors))
+
+
+def hsbk_array(colors):
+    """Return HSBK colours as an (N, 4) uint16 NumPy array.
+
+    Colours from a received message are not copied, the array is a read-only
+    view of the datagram. Such an array can be passed wherever a list of HSBK
+    tuples is expected, e.g. Light.set64() or Light.set_extended_color_zones().
+
+        :param colors: HSBKColors, HSBKZones or a sequence of HSBK tuples
+        :type colors: HSBKColors or list
+        :returns: The colours, one row per colour
+        :rtype: numpy.ndarray
+        :raises ImportError: If NumPy is not installed
+    """
+    if numpy is None:
+        raise ImportError("NumPy is required for HSBK arrays")
+    if isinstance(colors, (HSBKColors, HSBKZones)):
+        return numpy.frombuffer(colors.packed(), dtype="<u2").reshape(-1, 4)
+    return numpy.array(colors, dtype=numpy.uint16).reshape(-1, 4)
+
+
+class HSBKColors(Sequence):
+    """Read-only sequence of HSBK tuples backed by a received payload.
+
+    Colours are decoded from the buffer when they are accessed, so decoding a
+    TileState64 or an extended multizone message does not build 64 or 82 tuples
+    up front. Iterating goes through a single struct.iter_unpack over a
+    memoryview of the buffer.
+
+        :param buffer: The payload the colours are read from
+        :type buffer: bytes
+        :param offset: Position of the first colour in the buffer
+        :type offset: int
+        :param count: Number of colours, clamped to what the buffer holds
+        :type count: int
+    """
+
+    __slots__ = ("_buffer", "_offset", "_count")
+
+    def __init__(self, buffer, offset, count):
+        self._buffer = buffer
+        self._offset = offset
+        self._count = max(0, min(count, (len(buffer) - offset) // HSBK_STRUCT.size))
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._count)
+            if step == 1:
+                return HSBKColors(
+                    self._buffer, self._offset + start * 8, max(0, stop - start)
+                )
+            return [self[i] for i in range(start, stop, step)]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("HSBK index out of range")
+        return HSBK_STRUCT.unpack_from(self._buffer, self._offset + index * 8)
+
+    def __iter__(self):
+        return HSBK_STRUCT.iter_unpack(self.packed())
+
+    def __eq__(self, other):
+        if isinstance(other, Sequence):
+            return len(self) == len(other) and all(
+                tuple(a) == tuple(b) for a, b in zip(self, other)
+            )
+        return NotImplemented
+
+    def __repr__(self):
+        return repr(list(self))
+
+    def packed(self):
+        """Return the packed colours as a memoryview of the buffer (no copy)."""
+        start = self._offset
+        return memoryview(self._buffer)[start : start + self._count * 8]
+
+    def array(self):
+        """Return the colours as a read-only (N, 4) uint16 NumPy array, see hsbk_array."""
+        return hsbk_array(self)
+
+
+class HSBKZones(Sequence):
+    """Colours of the zones of a multizone light, packed in a single buffer.
+
+    The colours received are copied into the buffer as they are, and only decoded
+    into HSBK tuples when accessed. A zone whose colour is not known yet reads as None.
+
+        :param count: Number of zones
+        :type count: int
+    """
+
+    __slots__ = ("_buffer", "_known")
+
+    def __init__(self, count):
+        self._buffer = bytearray(count * HSBK_STRUCT.size)
+        self._known = bytearray(count)  # Not zero once the zone colour is known
+
+    def __len__(self):
+        return len(self._known)
+
+    def _index(self, index):
+        if index < 0:
+            index += len(self._known)
+        if not 0 <= index < len(self._known):
+            raise IndexError("zone index out of range")
+        return index
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self._known)))]
+        index = self._index(index)
+        if not self._known[index]:
+            return None
+        return HSBK_STRUCT.unpack_from(self._buffer, index * 8)
+
+    def __setitem__(self, index, color):
+        index = self._index(index)
+        if color is None:
+            self._known[index] = 0
+        else:
+            HSBK_STRUCT.pack_into(self._buffer, index * 8, *color)
+            self._known[index] = 1
+
+    def __iter__(self):
+        for known, color in zip(self._known, HSBK_STRUCT.iter_unpack(self._buffer)):
+            yield color if known else None
+
+    def __eq__(self, other):
+        if isinstance(other, Sequence):
+            return len(self) == len(other) and all(
+                a == (b if b is None else tuple(b)) for a, b in zip(self, other)
+            )
+        return NotImplemented
+
+    def __repr__(self):
+        return repr(list(self))
+
+    def update(self, start, colors):
+        """Set the colours of the zones from start on, those past the last zone are ignored.
+
+        Received HSBKColors are copied as is, without decoding them.
+
+            :param start: Index of the first zone to set
+            :type start: int
+            :param colors: HSBKColors or a sequence of HSBK tuples
+            :type colors: HSBKColors or list
+        """
+        count = max(0, min(len(colors), len(self._known) - start))
+        if isinstance(colors, HSBKColors):
+            self._buffer[start * 8 : (start + count) * 8] = colors[:count].packed()
+        else:
+            for index in range(count):
+                HSBK_STRUCT.pack_into(self._buffer, (start + index) * 8, *colors[index])
+        self._known[start : start + count] = b"\x01" * count
 
+    def packed(self):
+        """Return the packed colours, zero for the unknown ones, as a read-only memoryview."""
+        return memoryview(self._buffer).toreadonly()
 
-def little_endian(bs):
-    return bytes(reversed(bs.bytes))
+    def array(self):
+        """Return the colours as a read-only (N, 4) uint16 NumPy array, see hsbk_array."""
+        return hsbk_array(self)
@@ -7,8 +7,18 @@
 # Also need to make custom errors possibly, though tool may have those.
 
 from curses import color_content
-from .message import Message, BROADCAST_MAC, HEADER_SIZE_BYTES, little_endian
-import bitstring
+from .message import (
+    Message,
+    BROADCAST_MAC,
+    HEADER_SIZE_BYTES,
+    HEADER_STRUCT,
+    HSBK_STRUCT,
+    HSBKColors,
+    mac_to_str,
+    payload_layout,
+    hsbk_values,
+    hsbk_bytes,
+)
 from enum import Enum
 import random
 import sys
@@ -18,6 +28,8 @@ import struct
 
 
 class GetService(Message):
+    __slots__ = ()
+
     def __init__(
         self,
         target_addr,
@@ -39,6 +51,8 @@ class GetService(Message):
 
 
 class StateService(Message):
+    __slots__ = ("service", "port")
+
     def __init__(
         self,
         target_addr,
@@ -59,16 +73,16 @@ class StateService(Message):
             response_requested,
         )
 
+    payload_labels = (("Service", "service"), ("Port", "port"))
+    payload_struct = struct.Struct("<BI")
+
     def get_payload(self):
-        self.payload_fields.append(("Service", self.service))
-        self.payload_fields.append(("Port", self.port))
-        service = little_endian(bitstring.pack("uint:8", self.service))
-        port = little_endian(bitstring.pack("uint:32", self.port))
-        payload = service + port
-        return payload
+        return self.payload_struct.pack(self.service, self.port)
 
 
 class GetHostInfo(Message):
+    __slots__ = ()
+
     def __init__(
         self,
         target_addr,
@@ -89,6 +103,8 @@ class GetHostInfo(Message):
 
 
 class StateHostInfo(Message):
+    __slots__ = ("signal", "tx", "rx", "reserved1")
+
     def __init__(
         self,
         target_addr,
@@ -111,20 +127,21 @@ class StateHostInfo(Message):
             response_requested,
         )
 
+    payload_labels = (
+        ("Signal (mW)", "signal"),
+        ("TX (bytes since on)", "tx"),
+        ("RX (bytes since on)", "rx"),
+        ("Reserved", "reserved1"),
+    )
+    payload_struct = struct.Struct("<fIIh")
+
     def get_payload(self):
-        self.payload_fields.append(("Signal (mW)", self.signal))
-        self.payload_fields.append(("TX (bytes since on)", self.tx))
-        self.payload_fields.append(("RX (bytes since on)", self.rx))
-        self.payload_fields.append(("Reserved", self.reserved1))
-        signal = little_endian(bitstring.pack("float:32", self.signal))
-        tx = little_endian(bitstring.pack("uint:32", self.tx))
-        rx = little_endian(bitstring.pack("uint:32", self.rx))
-        reserved1 = little_endian(bitstring.pack("int:16", self.reserved1))
-        payload = signal + tx + rx + reserved1
-        return payload
+        return self.payload_struct.pack(self.signal, self.tx, self.rx, self.reserved1)
 
 
 class GetHostFirmware(Message):
+    __slots__ = ()
+
     def __init__(
         self,
         target_addr,
@@ -145,6 +162,8 @@ class GetHostFirmware(Message):
 
 
 class StateHostFirmware(Message):
+    __slots__ = ("build", "reserved1", "version")
+
     def __init__(
         self,
         target_addr,
@@ -166,18 +185,20 @@ class StateHostFirmware(Message):
             response_requested,
         )
 
+    payload_labels = (
+        ("Timestamp of Build", "build"),
+        ("Reserved", "reserved1"),
+        ("Version", "version"),
+    )
+    payload_struct = struct.Struct("<QQI")
+
     def get_payload(self):
-        self.payload_fields.append(("Timestamp of Build", self.build))
-        self.payload_fields.append(("Reserved", self.reserved1))
-        self.payload_fields.append(("Version", self.version))
-        build = little_endian(bitstring.pack("uint:64", self.build))
-        reserved1 = little_endian(bitstring.pack("uint:64", self.reserved1))
-        version = little_endian(bitstring.pack("uint:32", self.version))
-        payload = build + reserved1 + version
-        return payload
+        return self.payload_struct.pack(self.build, self.reserved1, self.version)
 
 
 class GetWifiInfo(Message):
+    __slots__ = ()
+
     def __init__(
         self,
         target_addr,
@@ -198,6 +219,8 @@ class GetWifiInfo(Message):
 
 
 class StateWifiInfo(Message):
+    __slots__ = ("signal", "tx", "rx", "reserved1")
+
     def __init__(
         self,
         target_addr,
@@ -220,20 +243,21 @@ class StateWifiInfo(Message):
             response_requested,
         )
 
+    payload_labels = (
+        ("Signal (mW)", "signal"),
+        ("TX (bytes since on)", "tx"),
+        ("RX (bytes since on)", "rx"),
+        ("Reserved", "reserved1"),
+    )
+    payload_struct = struct.Struct("<fIIh")
+
     def get_payload(self):
-        self.payload_fields.append(("Signal (mW)", self.signal))
-        self.payload_fields.append(("TX (bytes since on)", self.tx))
-        self.payload_fields.append(("RX (bytes since on)", self.rx))
-        self.payload_fields.append(("Reserved", self.reserved1))
-        signal = little_endian(bitstring.pack("float:32", self.signal))
-        tx = little_endian(bitstring.pack("uint:32", self.tx))
-        rx = little_endian(bitstring.pack("uint:32", self.rx))
-        reserved1 = little_endian(bitstring.pack("int:16", self.reserved1))
-        payload = signal + tx + rx + reserved1
-        return payload
+        return self.payload_struct.pack(self.signal, self.tx, self.rx, self.reserved1)
 
 
 class GetWifiFirmware(Message):
+    __slots__ = ()
+
     def __init__(
         self,
         target_addr,
@@ -254,6 +278,8 @@ class GetWifiFirmware(Message):
 
 
 class StateWifiFirmware(Message):
+    __slots__ = ("build", "reserved1", "version")
+
     def __init__(
         self,
         target_addr,
@@ -275,18 +301,20 @@ class StateWifiFirmware(Message):
             response_requested,
         )
 
+    payload_labels = (
+        ("Timestamp of Build", "build"),
+        ("Reserved", "reserved1"),
+        ("Version", "version"),
+    )
+    payload_struct = struct.Struct("<QQI")
+
     def get_payload(self):
-        self.payload_fields.append(("Timestamp of Build", self.build))
-        self.payload_fields.append(("Reserved", self.reserved1))
-        self.payload_fields.append(("Version", self.version))
-        build = little_endian(bitstring.pack("uint:64", self.build))
-        reserved1 = little_endian(bitstring.pack("uint:64", self.reserved1))
-        version = little_endian(bitstring.pack("uint:32", self.version))
-        payload = build + reserved1 + version
-        return payload
+        return self.payload_struct.pack(self.build, self.reserved1, self.version)
 
 
 class GetPower(Message):
+    __slots__ = ()
+
     def __init__(
         self,
         target_addr,
@@ -307,6 +335,8 @@ class GetPower(Message):
 
 
 class SetPower(Message):
+    __slots__ = ("power_level",)
+
     def __init__(
         self,
         target_addr,
@@ -326,14 +356,16 @@ class SetPower(Message):
             response_requested,
         )
 
+    payload_labels = (("Power", "power_level"),)
+    payload_struct = struct.Struct("<H")
+
     def get_payload(self):
-        self.payload_fields.append(("Power", self.power_level))
-        power_level = little_endian(bitstring.pack("uint:16", self.power_level))
-        payload = power_level
-        return payload
+        return self.payload_struct.pack(self.power_level)
 
 
 class StatePower(Message):
+    __slots__ = ("power_level",)
+
     def __init__(
         self,
         target_addr,
@@ -353,14 +385,16 @@ class StatePower(Message):
             response_requested,
         )
 
+    payload_labels = (("Power", "power_level"),)
+    payload_struct = struct.Struct("<H")
+
     def get_payload(self):
-        self.payload_fields.append(("Power", self.power_level))
-        power_level = little_endian(bitstring.pack("uint:16", self.power_level))
-        payload = power_level
-        return payload
+        return self.payload_struct.pack(self.power_level)
 
 
 class GetLabel(Message):
+    __slots__ = ()
+
     def __init__(
         self,
         target_addr,
@@ -381,6 +415,8 @@ class GetLabel(Message):
 
 
 class SetLabel(Message):
+    __slots__ = ("label",)
+
     def __init__(
         self,
         target_addr,
@@ -400,21 +436,18 @@ class SetLabel(Message):
             response_requested,
         )
 
+    payload_labels = (("Label", "label"),)
+    payload_struct = struct.Struct("<32s")
+
     def get_payload(self):
-        self.payload_fields.append(("Label", self.label))
-        field_len_bytes = 32
-        label = b"".join(
-            little_endian(bitstring.pack("uint:8", ord(c))) for c in self.label
-        )
-        padding = b"".join(
-            little_endian(bitstring.pack("uint:8", 0))
-            for i in range(field_len_bytes - len(self.label))
-        )
-        payload = label + padding
-        return payload
+        # UTF-8, as the labels received, cut to 32 bytes between two characters
+        label = self.label.encode()[:32].decode(errors="ignore").encode()
+        return self.payload_struct.pack(label)
 
 
 class StateLabel(Message):
+    __slots__ = ("label",)
+
     def __init__(
         self,
         target_addr,
@@ -434,19 +467,16 @@ class StateLabel(Message):
             response_requested,
         )
 
+    payload_labels = (("Label", "label"),)
+    payload_struct = struct.Struct("<32s")
+
     def get_payload(self):
-        self.payload_fields.append(("Label", self.label))
-        field_len_bytes = 32
-        label = b"".join(little_endian(bitstring.pack("uint:8", c)) for c in self.label)
-        padding = b"".join(
-            little_endian(bitstring.pack("uint:8", 0))
-            for i in range(field_len_bytes - len(self.label))
-        )
-        payload = label + padding
-        return payload
+        return self.payload_struct.pack(self.label)
 
 
 class GetVersion(Message):
+    __slots__ = ()
+
     def __init__(
         self,
         target_addr,
@@ -467,6 +497,8 @@ class GetVersion(Message):
 
 
 class StateVersion(Message):
+    __slots__ = ("vendor", "product", "version")
+
     def __init__(
         self,
         target_addr,
@@ -488,18 +520,20 @@ class StateVersion(Message):
             response_requested,
         )
 
+    payload_labels = (
+        ("Vendor", "vendor"),
+        ("Reserved", "product"),
+        ("Version", "version"),
+    )
+    payload_struct = struct.Struct("<III")
+
     def get_payload(self):
-        self.payload_fields.append(("Vendor", self.vendor))
-        self.payload_fields.append(("Reserved", self.product))
-        self.payload_fields.append(("Version", self.version))
-        vendor = little_endian(bitstring.pack("uint:32", self.vendor))
-        product = little_endian(bitstring.pack("uint:32", self.product))
-        version = little_endian(bitstring.pack("uint:32", self.version))
-        payload = vendor + product + version
-        return payload
+        return self.payload_struct.pack(self.vendor, self.product, self.version)
 
 
 class GetInfo(Message):
+    __slots__ = ()
+
     def __init__(
         self,
         target_addr,
@@ -520,6 +554,8 @@ class GetInfo(Message):
 
 
 class StateInfo(Message):
+    __slots__ = ("time", "uptime", "downtime")
+
     def __init__(
         self,
         target_addr,
@@ -541,20 +577,20 @@ class StateInfo(Message):
             response_requested,
         )
 
+    payload_labels = (
+        ("Current Time", "time"),
+        ("Uptime (ns)", "uptime"),
+        ("Last Downtime Duration (ns) (5 second error)", "downtime"),
+    )
+    payload_struct = struct.Struct("<QQQ")
+
     def get_payload(self):
-        self.payload_fields.append(("Current Time", self.time))
-        self.payload_fields.append(("Uptime (ns)", self.uptime))
-        self.payload_fields.append(
-            ("Last Downtime Duration (ns) (5 second error)", self.downtime)
-        )
-        time = little_endian(bitstring.pack("uint:64", self.time))
-        uptime = little_endian(bitstring.pack("uint:64", self.uptime))
-        downtime = little_endian(bitstring.pack("uint:64", self.downtime))
-        payload = time + uptime + downtime
-        return payload
+        return self.payload_struct.pack(self.time, self.uptime, self.downtime)
 
 
 class GetLocation(Message):
+    __slots__ = ()
+
     def __init__(
         self,
         target_addr,
@@ -575,6 +611,8 @@ class GetLocation(Message):
 
 
 class StateLocation(Message):
+    __slots__ = ("location", "label", "updated_at")
+
     def __init__(
         self,
         target_addr,
@@ -596,25 +634,22 @@ class StateLocation(Message):
             response_requested,
         )
 
+    payload_labels = (
+        ("Location ", "location"),
+        ("Label ", "label"),
+        ("Updated At ", "updated_at"),
+    )
+    payload_struct = struct.Struct("<16s32sQ")
+
     def get_payload(self):
-        self.payload_fields.append(("Location ", self.location))
-        self.payload_fields.append(("Label ", self.label))
-        self.payload_fields.append(("Updated At ", self.updated_at))
-        location = b"".join(
-            little_endian(bitstring.pack("uint:8", b)) for b in self.location
-        )
-        label = b"".join(little_endian(bitstring.pack("uint:8", c)) for c in self.label)
-        label_padding = b"".join(
-            little_endian(bitstring.pack("uint:8", 0))
-            for i in range(32 - len(self.label))
-        )
-        label += label_padding
-        updated_at = little_endian(bitstring.pack("uint:64", self.updated_at))
-        payload = location + label + updated_at
-        return payload
+        return self.payload_struct.pack(
+            bytes(self.location), self.label, self.updated_at
+        )
 
 
 class GetGroup(Message):
+    __slots__ = ()
+
     def __init__(
         self,
         target_addr,
@@ -635,6 +670,8 @@ class GetGroup(Message):
 
 
 class StateGroup(Message):
+    __slots__ = ("group", "label", "updated_at")
+
     def __init__(
         self,
         target_addr,
@@ -656,23 +693,20 @@ class StateGroup(Message):
             response_requested,
         )
 
+    payload_labels = (
+        ("Group ", "group"),
+        ("Label ", "label"),
+        ("Updated At ", "updated_at"),
+    )
+    payload_struct = struct.Struct("<16s32sQ")
+
     def get_payload(self):
-        self.payload_fields.append(("Group ", self.group))
-        self.payload_fields.append(("Label ", self.label))
-        self.payload_fields.append(("Updated At ", self.updated_at))
-        group = b"".join(little_endian(bitstring.pack("uint:8", b)) for b in self.group)
-        label = b"".join(little_endian(bitstring.pack("uint:8", c)) for c in self.label)
-        label_padding = b"".join(
-            little_endian(bitstring.pack("uint:8", 0))
-            for i in range(32 - len(self.label))
-        )
-        label += label_padding
-        updated_at = little_endian(bitstring.pack("uint:64", self.updated_at))
-        payload = group + label + updated_at
-        return payload
+        return self.payload_struct.pack(bytes(self.group), self.label, self.updated_at)
 
 
 class SetReboot(Message):
+    __slots__ = ()
+
     def __init__(
         self,
         target_addr: str,
@@ -694,6 +728,8 @@ class SetReboot(Message):
 
 
 class Acknowledgement(Message):
+    __slots__ = ()
+
     def __init__(
         self,
         target_addr,
@@ -714,6 +750,8 @@ class Acknowledgement(Message):
 
 
 class EchoRequest(Message):
+    __slots__ = ("byte_array",)
+
     def __init__(
         self,
         target_addr,
@@ -733,25 +771,16 @@ class EchoRequest(Message):
             response_requested,
         )
 
+    payload_labels = (("Byte Array", "byte_array"),)
+    payload_struct = struct.Struct("<64s")
+
     def get_payload(self):
-        field_len = 64
-        self.payload_fields.append(("Byte Array", self.byte_array))
-        byte_array = b"".join(
-            little_endian(bitstring.pack("uint:8", b)) for b in self.byte_array
-        )
-        byte_array_len = len(byte_array)
-        if byte_array_len < field_len:
-            byte_array += b"".join(
-                little_endian(bitstring.pack("uint:8", 0))
-                for i in range(field_len - byte_array_len)
-            )
-        elif byte_array_len > field_len:
-            byte_array = byte_array[:field_len]
-        payload = byte_array
-        return payload
+        return self.payload_struct.pack(bytes(self.byte_array))
 
 
 class EchoResponse(Message):
+    __slots__ = ("byte_array",)
+
     def __init__(
         self,
         target_addr,
@@ -771,19 +800,18 @@ class EchoResponse(Message):
             response_requested,
         )
 
+    payload_labels = (("Byte Array", "byte_array"),)
+
     def get_payload(self):
-        self.payload_fields.append(("Byte Array", self.byte_array))
-        byte_array = b"".join(
-            little_endian(bitstring.pack("uint:8", b)) for b in self.byte_array
-        )
-        payload = byte_array
-        return payload
+        return bytes(self.byte_array)
 
 
 ##### LIGHT MESSAGES #####
 
 
 class LightGet(Message):
+    __slots__ = ()
+
     def __init__(
         self,
         target_addr,
@@ -804,6 +832,8 @@ class LightGet(Message):
 
 
 class LightSetColor(Message):
+    __slots__ = ("color", "duration")
+
     def __init__(
         self,
         target_addr,
@@ -824,18 +854,15 @@ class LightSetColor(Message):
             response_requested,
         )
 
+    payload_struct = struct.Struct("<B4HI")
+
     def get_payload(self):
-        reserved_8 = little_endian(bitstring.pack("uint:8", self.reserved))
-        color = b"".join(
-            little_endian(bitstring.pack("uint:16", field)) for field in self.color
-        )
-        duration = little_endian(bitstring.pack("uint:32", self.duration))
-        payload = reserved_8 + color + duration
-        payloadUi = " ".join("{:02x}".format(c) for c in payload)
-        return payload
+        return self.payload_struct.pack(self.reserved, *self.color, self.duration)
 
 
 class LightSetWaveform(Message):
+    __slots__ = ("transient", "color", "period", "cycles", "skew_ratio", "waveform")
+
     def __init__(
         self,
         target_addr,
@@ -860,25 +887,34 @@ class LightSetWaveform(Message):
             response_requested,
         )
 
+    payload_struct = struct.Struct("<BB4HIfhB")
+
     def get_payload(self):
-        reserved_8 = little_endian(bitstring.pack("uint:8", self.reserved))
-        transient = little_endian(bitstring.pack("uint:8", self.transient))
-        color = b"".join(
-            little_endian(bitstring.pack("uint:16", field)) for field in self.color
-        )
-        period = little_endian(bitstring.pack("uint:32", self.period))
-        cycles = little_endian(bitstring.pack("float:32", self.cycles))
-        skew_ratio = little_endian(bitstring.pack("int:16", self.skew_ratio))
-        waveform = little_endian(bitstring.pack("uint:8", self.waveform))
-        payload = (
-            reserved_8 + transient + color + period + cycles + skew_ratio + waveform
+        return self.payload_struct.pack(
+            self.reserved,
+            self.transient,
+            *self.color,
+            self.period,
+            self.cycles,
+            self.skew_ratio,
+            self.waveform,
         )
 
-        payloadUi = " ".join("{:02x}".format(c) for c in payload)
-        return payload
-
 
 class LightSetWaveformOptional(Message):
+    __slots__ = (
+        "transient",
+        "color",
+        "period",
+        "cycles",
+        "skew_ratio",
+        "waveform",
+        "set_hue",
+        "set_saturation",
+        "set_brightness",
+        "set_kelvin",
+    )
+
     def __init__(
         self,
         target_addr,
@@ -907,39 +943,27 @@ class LightSetWaveformOptional(Message):
             response_requested,
         )
 
+    payload_struct = struct.Struct("<BB4HIfhBBBBB")
+
     def get_payload(self):
-        reserved_8 = little_endian(bitstring.pack("uint:8", self.reserved))
-        transient = little_endian(bitstring.pack("uint:8", self.transient))
-        color = b"".join(
-            little_endian(bitstring.pack("uint:16", field)) for field in self.color
-        )
-        period = little_endian(bitstring.pack("uint:32", self.period))
-        cycles = little_endian(bitstring.pack("float:32", self.cycles))
-        skew_ratio = little_endian(bitstring.pack("int:16", self.skew_ratio))
-        waveform = little_endian(bitstring.pack("uint:8", self.waveform))
-        set_hue = little_endian(bitstring.pack("uint:8", self.set_hue))
-        set_saturation = little_endian(bitstring.pack("uint:8", self.set_saturation))
-        set_brightness = little_endian(bitstring.pack("uint:8", self.set_brightness))
-        set_kelvin = little_endian(bitstring.pack("uint:8", self.set_kelvin))
-        payload = (
-            reserved_8
-            + transient
-            + color
-            + period
-            + cycles
-            + skew_ratio
-            + waveform
-            + set_hue
-            + set_saturation
-            + set_brightness
-            + set_kelvin
-        )
-
-        payloadUi = " ".join("{:02x}".format(c) for c in payload)
-        return payload
+        return self.payload_struct.pack(
+            self.reserved,
+            self.transient,
+            *self.color,
+            self.period,
+            self.cycles,
+            self.skew_ratio,
+            self.waveform,
+            self.set_hue,
+            self.set_saturation,
+            self.set_brightness,
+            self.set_kelvin,
+        )
 
 
 class LightState(Message):
+    __slots__ = ("color", "reserved1", "power_level", "label", "reserved2")
+
     def __init__(
         self,
         target_addr,
@@ -963,24 +987,24 @@ class LightState(Message):
             response_requested,
         )
 
+    payload_labels = (
+        ("Color (HSBK)", "color"),
+        ("Reserved", "reserved1"),
+        ("Power Level", "power_level"),
+        ("Label", "label"),
+        ("Reserved", "reserved2"),
+    )
+    payload_struct = struct.Struct("<4HhH32sQ")
+
     def get_payload(self):
-        self.payload_fields.append(("Color (HSBK)", self.color))
-        self.payload_fields.append(("Reserved", self.reserved1))
-        self.payload_fields.append(("Power Level", self.power_level))
-        self.payload_fields.append(("Label", self.label))
-        self.payload_fields.append(("Reserved", self.reserved2))
-        color = b"".join(
-            little_endian(bitstring.pack("uint:16", field)) for field in self.color
-        )
-        reserved1 = little_endian(bitstring.pack("int:16", self.reserved1))
-        power_level = little_endian(bitstring.pack("uint:16", self.power_level))
-        label = self.label.ljust(32, b"\0")
-        reserved2 = little_endian(bitstring.pack("uint:64", self.reserved1))
-        payload = color + reserved1 + power_level + label + reserved2
-        return payload
+        return self.payload_struct.pack(
+            *self.color, self.reserved1, self.power_level, self.label, self.reserved2
+        )
 
 
 class LightGetPower(Message):
+    __slots__ = ()
+
     def __init__(
         self,
         target_addr,
@@ -1001,6 +1025,8 @@ class LightGetPower(Message):
 
 
 class LightSetPower(Message):
+    __slots__ = ("power_level", "duration")
+
     def __init__(
         self,
         target_addr,
@@ -1021,14 +1047,15 @@ class LightSetPower(Message):
             response_requested,
         )
 
+    payload_struct = struct.Struct("<HI")
+
     def get_payload(self):
-        power_level = little_endian(bitstring.pack("uint:16", self.power_level))
-        duration = little_endian(bitstring.pack("uint:32", self.duration))
-        payload = power_level + duration
-        return payload
+        return self.payload_struct.pack(self.power_level, self.duration)
 
 
 class LightStatePower(Message):
+    __slots__ = ("power_level",)
+
     def __init__(
         self,
         target_addr,
@@ -1048,17 +1075,19 @@ class LightStatePower(Message):
             response_requested,
         )
 
+    payload_labels = (("Power Level", "power_level"),)
+    payload_struct = struct.Struct("<H")
+
     def get_payload(self):
-        self.payload_fields.append(("Power Level", self.power_level))
-        power_level = little_endian(bitstring.pack("uint:16", self.power_level))
-        payload = power_level
-        return payload
+        return self.payload_struct.pack(self.power_level)
 
 
 ##### INFRARED MESSAGES #####
 
 
 class LightGetInfrared(Message):
+    __slots__ = ()
+
     def __init__(
         self,
         target_addr,
@@ -1079,6 +1108,8 @@ class LightGetInfrared(Message):
 
 
 class LightStateInfrared(Message):
+    __slots__ = ("infrared_brightness",)
+
     def __init__(
         self,
         target_addr,
@@ -1098,16 +1129,16 @@ class LightStateInfrared(Message):
             response_requested,
         )
 
+    payload_labels = (("Infrared Brightness", "infrared_brightness"),)
+    payload_struct = struct.Struct("<H")
+
     def get_payload(self):
-        self.payload_fields.append(("Infrared Brightness", self.infrared_brightness))
-        infrared_brightness = little_endian(
-            bitstring.pack("uint:16", self.infrared_brightness)
-        )
-        payload = infrared_brightness
-        return payload
+        return self.payload_struct.pack(self.infrared_brightness)
 
 
 class LightSetInfrared(Message):
+    __slots__ = ("infrared_brightness",)
+
     def __init__(
         self,
         target_addr,
@@ -1127,17 +1158,17 @@ class LightSetInfrared(Message):
             response_requested,
         )
 
+    payload_struct = struct.Struct("<H")
+
     def get_payload(self):
-        infrared_brightness = little_endian(
-            bitstring.pack("uint:16", self.infrared_brightness)
-        )
-        payload = infrared_brightness
-        return payload
+        return self.payload_struct.pack(self.infrared_brightness)
 
 
 ##### HEV (LIFX Clean) MESSAGES #####
 # https://lan.developer.lifx.com/docs/hev-light-control
 class GetHevCycle(Message):
+    __slots__ = ()
+
     def __init__(
         self,
         target_addr,
@@ -1158,6 +1189,8 @@ class GetHevCycle(Message):
 
 
 class SetHevCycle(Message):
+    __slots__ = ("enable", "duration")
+
     def __init__(
         self,
         target_addr,
@@ -1178,14 +1211,15 @@ class SetHevCycle(Message):
             response_requested,
         )
 
+    payload_struct = struct.Struct("<BI")
+
     def get_payload(self):
-        enable = little_endian(bitstring.pack("uint:8", self.enable))
-        duration = little_endian(bitstring.pack("uint:32", self.duration))
-        payload = enable + duration
-        return payload
+        return self.payload_struct.pack(self.enable, self.duration)
 
 
 class StateHevCycle(Message):
+    __slots__ = ("duration", "remaining", "last_power")
+
     def __init__(
         self,
         target_addr,
@@ -1207,15 +1241,15 @@ class StateHevCycle(Message):
             response_requested,
         )
 
+    payload_struct = struct.Struct("<IIB")
+
     def get_payload(self):
-        duration = little_endian(bitstring.pack("uint:32", self.duration))
-        remaining = little_endian(bitstring.pack("uint:32", self.remaining))
-        last_power = little_endian(bitstring.pack("uint:8", self.last_power))
-        payload = duration + remaining + last_power
-        return payload
+        return self.payload_struct.pack(self.duration, self.remaining, self.last_power)
 
 
 class GetHevCycleConfiguration(Message):
+    __slots__ = ()
+
     def __init__(
         self,
         target_addr,
@@ -1236,6 +1270,8 @@ class GetHevCycleConfiguration(Message):
 
 
 class SetHevCycleConfiguration(Message):
+    __slots__ = ("indication", "duration")
+
     def __init__(
         self,
         target_addr,
@@ -1256,14 +1292,15 @@ class SetHevCycleConfiguration(Message):
             response_requested,
         )
 
+    payload_struct = struct.Struct("<BI")
+
     def get_payload(self):
-        indication = little_endian(bitstring.pack("uint:8", self.indication))
-        duration = little_endian(bitstring.pack("uint:32", self.duration))
-        payload = indication + duration
-        return payload
+        return self.payload_struct.pack(self.indication, self.duration)
 
 
 class StateHevCycleConfiguration(Message):
+    __slots__ = ("indication", "duration")
+
     def __init__(
         self,
         target_addr,
@@ -1284,14 +1321,15 @@ class StateHevCycleConfiguration(Message):
             response_requested,
         )
 
+    payload_struct = struct.Struct("<BI")
+
     def get_payload(self):
-        indication = little_endian(bitstring.pack("uint:8", self.indication))
-        duration = little_endian(bitstring.pack("uint:32", self.duration))
-        payload = indication + duration
-        return payload
+        return self.payload_struct.pack(self.indication, self.duration)
 
 
 class GetLastHevCycleResult(Message):
+    __slots__ = ()
+
     def __init__(
         self,
         target_addr,
@@ -1312,6 +1350,8 @@ class GetLastHevCycleResult(Message):
 
 
 class StateLastHevCycleResult(Message):
+    __slots__ = ("result",)
+
     def __init__(
         self,
         target_addr,
@@ -1331,9 +1371,10 @@ class StateLastHevCycleResult(Message):
             response_requested,
         )
 
+    payload_struct = struct.Struct("<B")
+
     def get_payload(self):
-        result = little_endian(bitstring.pack("uint:8", self.result))
-        return result
+        return self.payload_struct.pack(self.result)
 
     @property
     def result_str(self):
@@ -1344,6 +1385,8 @@ class StateLastHevCycleResult(Message):
 
 
 class MultiZoneStateMultiZone(Message):
+    __slots__ = ("count", "index", "color")
+
     def __init__(
         self,
         target_addr,
@@ -1365,21 +1408,17 @@ class MultiZoneStateMultiZone(Message):
             response_requested,
         )
 
+    payload_labels = (("Count", "count"), ("Index", "index"), ("Color (HSBK)", "color"))
+
     def get_payload(self):
-        self.payload_fields.append(("Count", self.count))
-        self.payload_fields.append(("Index", self.index))
-        self.payload_fields.append(("Color (HSBK)", self.color))
-        count = little_endian(bitstring.pack("uint:8", self.count))
-        index = little_endian(bitstring.pack("uint:8", self.index))
-        payload = count + index
-        for color in self.color:
-            payload += b"".join(
-                little_endian(bitstring.pack("uint:16", field)) for field in color
-            )
-        return payload
+        return payload_layout("<BB", len(self.color)).pack(
+            self.count, self.index, *hsbk_values(self.color)
+        )
 
 
 class MultiZoneStateZone(Message):  # 503
+    __slots__ = ("count", "index", "color")
+
     def __init__(
         self,
         target_addr,
@@ -1401,20 +1440,16 @@ class MultiZoneStateZone(Message):  # 503
             response_requested,
         )
 
+    payload_labels = (("Count", "count"), ("Index", "index"), ("Color (HSBK)", "color"))
+    payload_struct = struct.Struct("<BB4H")
+
     def get_payload(self):
-        self.payload_fields.append(("Count", self.count))
-        self.payload_fields.append(("Index", self.index))
-        self.payload_fields.append(("Color (HSBK)", self.color))
-        count = little_endian(bitstring.pack("uint:8", self.count))
-        index = little_endian(bitstring.pack("uint:8", self.index))
-        color = b"".join(
-            little_endian(bitstring.pack("uint:16", field)) for field in self.color
-        )
-        payload = count + index + color
-        return payload
+        return self.payload_struct.pack(self.count, self.index, *self.color)
 
 
 class MultiZoneSetColorZones(Message):
+    __slots__ = ("start_index", "end_index", "color", "duration", "apply")
+
     def __init__(
         self,
         target_addr,
@@ -1438,19 +1473,17 @@ class MultiZoneSetColorZones(Message):
             response_requested,
         )
 
+    payload_struct = struct.Struct("<BB4HIB")
+
     def get_payload(self):
-        start_index = little_endian(bitstring.pack("uint:8", self.start_index))
-        end_index = little_endian(bitstring.pack("uint:8", self.end_index))
-        color = b"".join(
-            little_endian(bitstring.pack("uint:16", field)) for field in self.color
-        )
-        duration = little_endian(bitstring.pack("uint:32", self.duration))
-        apply = little_endian(bitstring.pack("uint:8", self.apply))
-        payload = start_index + end_index + color + duration + apply
-        return payload
+        return self.payload_struct.pack(
+            self.start_index, self.end_index, *self.color, self.duration, self.apply
+        )
 
 
 class MultiZoneGetColorZones(Message):
+    __slots__ = ("start_index", "end_index")
+
     def __init__(
         self,
         target_addr,
@@ -1471,14 +1504,15 @@ class MultiZoneGetColorZones(Message):
             response_requested,
         )
 
+    payload_struct = struct.Struct("<BB")
+
     def get_payload(self):
-        start_index = little_endian(bitstring.pack("uint:8", self.start_index))
-        end_index = little_endian(bitstring.pack("uint:8", self.end_index))
-        payload = start_index + end_index
-        return payload
+        return self.payload_struct.pack(self.start_index, self.end_index)
 
 
 class MultiZoneGetMultiZoneEffect(Message):
+    __slots__ = ()
+
     def __init__(
         self,
         target_addr,
@@ -1499,6 +1533,8 @@ class MultiZoneGetMultiZoneEffect(Message):
 
 
 class MultiZoneSetMultiZoneEffect(Message):
+    __slots__ = ("instanceid", "type", "speed", "duration", "direction")
+
     def __init__(
         self,
         target_addr,
@@ -1522,34 +1558,27 @@ class MultiZoneSetMultiZoneEffect(Message):
             response_requested,
         )
 
+    # The reserved and parameter values are what the LIFX app sends
+    payload_struct = struct.Struct("<IBhIQiiII6I")
+
     def get_payload(self):
-        instanceid = little_endian(bitstring.pack("uint:32", self.instanceid))
-        type = little_endian(bitstring.pack("uint:8", self.type))
-        reserved6 = little_endian(bitstring.pack("int:16", 2))
-        speed = little_endian(bitstring.pack("uint:32", self.speed))
-        duration = little_endian(bitstring.pack("uint:64", self.duration))
-        reserved7 = little_endian(bitstring.pack("int:32", 4))
-        reserved8 = little_endian(bitstring.pack("int:32", 4))
-        parameter1 = little_endian(bitstring.pack("uint:32", 4))
-        direction = little_endian(bitstring.pack("uint:32", self.direction))
-        parameter3 = little_endian(bitstring.pack("uint:32", 4))
-
-        payload = (
-            instanceid
-            + type
-            + reserved6
-            + speed
-            + duration
-            + reserved7
-            + reserved8
-            + parameter1
-            + direction
-            + parameter3 * 6
+        return self.payload_struct.pack(
+            self.instanceid,
+            self.type,
+            2,
+            self.speed,
+            self.duration,
+            4,
+            4,
+            4,
+            self.direction,
+            *(4,) * 6,
         )
-        return payload
 
 
 class MultiZoneStateMultiZoneEffect(Message):
+    __slots__ = ("instanceid", "effect", "speed", "duration", "direction")
+
     def __init__(
         self,
         target_addr,
@@ -1574,40 +1603,25 @@ class MultiZoneStateMultiZoneEffect(Message):
             response_requested,
         )
 
+    payload_labels = (
+        ("Instance ID", "instanceid"),
+        ("Effect", "effect"),
+        ("Speed", "speed"),
+        ("Duration", "duration"),
+        ("Direction", "direction"),
+    )
+    payload_struct = struct.Struct("<IBHIQ12xI24x")
+
     def get_payload(self):
-        self.payload_fields.append("Instance ID", self.instanceid)
-        self.payload_fields.append("Effect", self.effect)
-        self.payload_fields.append("Speed", self.speed)
-        self.payload_fields.append("Duration", self.duration)
-        self.payload_fields.append("Direction", self.direction)
-        instanceid = little_endian(bitstring.pack("uint:32", self.instanceid))
-        effect = little_endian(bitstring.pack("uint:8", self.effect))
-        speed = little_endian(bitstring.pack("uint:32", self.speed))
-        duration = little_endian(bitstring.pack("uint:64", self.duration))
-        parameter1 = b"".join(little_endian(bitstring.pack("uint:8", 8)))
-        direction = b"".join(
-            little_endian(bitstring.pack("uint:8", c)) for c in self.direction
-        )
-        direction_padding = b"".join(
-            little_endian(bitstring.pack("uint:8", 0))
-            for i in range(8 - len(self.direction))
-        )
-        direction += direction_padding
-        parameter3 = b"".join(little_endian(bitstring.pack("uint:8", 8)))
-        parameter4 = b"".join(little_endian(bitstring.pack("uint:8", 8)))
-        payload = (
-            instanceid
-            + effect
-            + speed
-            + duration
-            + parameter1
-            + direction
-            + parameter3
-            + parameter4
+        return self.payload_struct.pack(
+            self.instanceid,
+            self.effect,
+            0,
+            self.speed,
+            self.duration,
+            self.direction,
         )
 
-        return payload
-
     @property
     def effect_str(self):
         return MultiZoneEffectType(self.effect).name.upper()
@@ -1618,6 +1632,8 @@ class MultiZoneStateMultiZoneEffect(Message):
 
 
 class MultiZoneSetExtendedColorZones(Message):
+    __slots__ = ("duration", "apply", "zone_index", "colors_count", "colors")
+
     def __init__(
         self,
         target_addr,
@@ -1641,20 +1657,17 @@ class MultiZoneSetExtendedColorZones(Message):
             response_requested,
         )
 
+    payload_struct = struct.Struct("<IBHB")
+
     def get_payload(self):
-        duration = little_endian(bitstring.pack("uint:32", self.duration))
-        apply = little_endian(bitstring.pack("uint:8", self.apply))
-        zone_index = little_endian(bitstring.pack("uint:16", self.zone_index))
-        colors_count = little_endian(bitstring.pack("uint:8", self.colors_count))
-        payload = duration + apply + zone_index + colors_count
-        for color in self.colors:
-            payload += b"".join(
-                little_endian(bitstring.pack("uint:16", field)) for field in color
-            )
-        return payload
+        return self.payload_struct.pack(
+            self.duration, self.apply, self.zone_index, self.colors_count
+        ) + hsbk_bytes(self.colors)
 
 
 class MultiZoneGetExtendedColorZones(Message):
+    __slots__ = ()
+
     def __init__(
         self,
         target_addr,
@@ -1675,6 +1688,8 @@ class MultiZoneGetExtendedColorZones(Message):
 
 
 class MultiZoneStateExtendedColorZones(Message):
+    __slots__ = ("zones_count", "zone_index", "colors_count", "colors")
+
     def __init__(
         self,
         target_addr,
@@ -1697,23 +1712,24 @@ class MultiZoneStateExtendedColorZones(Message):
             response_requested,
         )
 
+    payload_labels = (
+        ("Zones Count", "zones_count"),
+        ("Zone Index", "zone_index"),
+        ("Colors count", "colors_count"),
+        ("Colors", "colors"),
+    )
+
+    payload_struct = struct.Struct("<HHB")
+
     def get_payload(self):
-        self.payload_fields.append(("Zones Count", self.zones_count))
-        self.payload_fields.append(("Zone Index", self.zone_index))
-        self.payload_fields.append(("Colors count", self.colors_count))
-        self.payload_fields.append(("Colors", self.colors))
-        zones_count = little_endian(bitstring.pack("uint:16", self.zones_count))
-        zone_index = little_endian(bitstring.pack("uint:16", self.zone_index))
-        colors_count = little_endian(bitstring.pack("uint:8", self.colors_count))
-        payload = zones_count + zone_index + colors_count
-        for color in self.colors:
-            payload += b"".join(
-                little_endian(bitstring.pack("uint:16", field)) for field in color
-            )
-        return payload
+        return self.payload_struct.pack(
+            self.zones_count, self.zone_index, self.colors_count
+        ) + hsbk_bytes(self.colors)
 
 
 class TileGetDeviceChain(Message):
+    __slots__ = ()
+
     def __init__(
         self,
         target_addr,
@@ -1734,6 +1750,8 @@ class TileGetDeviceChain(Message):
 
 
 class TileStateDeviceChain(Message):
+    __slots__ = ("start_index", "tile_devices", "tile_devices_count")
+
     def __init__(
         self,
         target_addr,
@@ -1755,45 +1773,42 @@ class TileStateDeviceChain(Message):
             response_requested,
         )
 
+    payload_labels = (
+        ("Start Index", "start_index"),
+        ("Devices", "tile_devices"),
+        ("Devices Count", "tile_devices_count"),
+    )
+    payload_struct = struct.Struct("<B")
+    tile_struct = struct.Struct("<3h2x2f2BxII4xQ8xHH4x")
+
     def get_payload(self):
-        self.payload_fields.append(("Start Index", self.start_index))
-        self.payload_fields.append(("Devices", self.tile_devices))
-        self.payload_fields.append(("Devices Count", self.tile_devices_count))
-
-        start_index = little_endian(bitstring.pack("uint:8", self.start_index))
-        tile_devices = b""
-        for tile_device in self.tile_devices:
-            tile_devices += b"".join(
-                little_endian(bitstring.pack("int:16", tile_device["accel_meas_x"])),
-                little_endian(bitstring.pack("int:16", tile_device["accel_meas_y"])),
-                little_endian(bitstring.pack("int:16", tile_device["accel_meas_z"])),
-                little_endian(bitstring.pack("float", tile_device["user_x"])),
-                little_endian(bitstring.pack("float", tile_device["user_y"])),
-                little_endian(bitstring.pack("uint:8", tile_device["width"])),
-                little_endian(bitstring.pack("uint:8", tile_device["height"])),
-                little_endian(
-                    bitstring.pack("uint:32", tile_device["device_version_vendor"])
-                ),
-                little_endian(
-                    bitstring.pack("uint:32", tile_device["device_version_product"])
-                ),
-                little_endian(bitstring.pack("uint:64", tile_device["firmware_build"])),
-                little_endian(
-                    bitstring.pack("uint:16", tile_device["firmware_version_minor"])
-                ),
-                little_endian(
-                    bitstring.pack("uint:16", tile_device["firmware_version_major"])
-                ),
+        tile_devices = b"".join(
+            self.tile_struct.pack(
+                tile_device["accel_meas_x"],
+                tile_device["accel_meas_y"],
+                tile_device["accel_meas_z"],
+                tile_device["user_x"],
+                tile_device["user_y"],
+                tile_device["width"],
+                tile_device["height"],
+                tile_device["device_version_vendor"],
+                tile_device["device_version_product"],
+                tile_device["firmware_build"],
+                tile_device["firmware_version_minor"],
+                tile_device["firmware_version_major"],
             )
-        tile_devices_count = little_endian(
-            bitstring.pack("uint:8", self.tile_devices_count)
+            for tile_device in self.tile_devices
+        )
+        return (
+            self.payload_struct.pack(self.start_index)
+            + tile_devices
+            + self.payload_struct.pack(self.tile_devices_count)
         )
-
-        payload = start_index + tile_devices + tile_devices_count
-        return payload
 
 
 class TileGet64(Message):
+    __slots__ = ("tile_index", "length", "x", "y", "width")
+
     def __init__(
         self,
         target_addr,
@@ -1817,18 +1832,17 @@ class TileGet64(Message):
             response_requested,
         )
 
+    payload_struct = struct.Struct("<BBxBBB")
+
     def get_payload(self):
-        tile_index = little_endian(bitstring.pack("uint:8", self.tile_index))
-        length = little_endian(bitstring.pack("uint:8", self.length))
-        reserved = little_endian(bitstring.pack("uint:8", 0))
-        x = little_endian(bitstring.pack("uint:8", self.x))
-        y = little_endian(bitstring.pack("uint:8", self.y))
-        width = little_endian(bitstring.pack("uint:8", self.width))
-        payload = tile_index + length + reserved + x + y + width
-        return payload
+        return self.payload_struct.pack(
+            self.tile_index, self.length, self.x, self.y, self.width
+        )
 
 
 class TileSet64(Message):
+    __slots__ = ("tile_index", "length", "x", "y", "width", "duration", "colors")
+
     def __init__(
         self,
         target_addr,
@@ -1854,23 +1868,17 @@ class TileSet64(Message):
             response_requested,
         )
 
+    payload_struct = struct.Struct("<BBxBBBI")
+
     def get_payload(self):
-        tile_index = little_endian(bitstring.pack("uint:8", self.tile_index))
-        length = little_endian(bitstring.pack("uint:8", self.length))
-        reserved = little_endian(bitstring.pack("int:8", 0))
-        x = little_endian(bitstring.pack("uint:8", self.x))
-        y = little_endian(bitstring.pack("uint:8", self.y))
-        width = little_endian(bitstring.pack("uint:8", self.width))
-        duration = little_endian(bitstring.pack("uint:32", self.duration))
-        payload = tile_index + length + reserved + x + y + width + duration
-        for color in self.colors:
-            payload += b"".join(
-                little_endian(bitstring.pack("uint:16", field)) for field in color
-            )
-        return payload
+        return self.payload_struct.pack(
+            self.tile_index, self.length, self.x, self.y, self.width, self.duration
+        ) + hsbk_bytes(self.colors)
 
 
 class TileState64(Message):
+    __slots__ = ("tile_index", "x", "y", "width", "colors")
+
     def __init__(
         self,
         target_addr,
@@ -1894,26 +1902,24 @@ class TileState64(Message):
             response_requested,
         )
 
+    payload_labels = (
+        ("Tile Index", "tile_index"),
+        ("x", "x"),
+        ("y", "y"),
+        ("width", "width"),
+    )
+
+    payload_struct = struct.Struct("<BxBBB")
+
     def get_payload(self):
-        self.payload_fields.append(("Tile Index", self.tile_index))
-        self.payload_fields.append(("x", self.x))
-        self.payload_fields.append(("y", self.y))
-        self.payload_fields.append(("width", self.width))
-
-        tile_index = little_endian(bitstring.pack("uint:8", self.tile_index))
-        x = little_endian(bitstring.pack("uint:8", self.x))
-        y = little_endian(bitstring.pack("uint:8", self.y))
-        width = little_endian(bitstring.pack("uint:8", self.width))
-        payload = tile_index + x + y + width
-
-        for color in self.colors:
-            payload += b"".join(
-                little_endian(bitstring.pack("uint:16", field)) for field in color
-            )
-        return payload
+        return self.payload_struct.pack(
+            self.tile_index, self.x, self.y, self.width
+        ) + hsbk_bytes(self.colors)
 
 
 class TileGetTileEffect(Message):
+    __slots__ = ()
+
     def __init__(
         self,
         target_addr,
@@ -1934,6 +1940,18 @@ class TileGetTileEffect(Message):
 
 
 class TileSetTileEffect(Message):
+    __slots__ = (
+        "instanceid",
+        "type",
+        "speed",
+        "duration",
+        "sky_type",
+        "cloud_saturation_min",
+        "cloud_saturation_max",
+        "palette_count",
+        "palette",
+    )
+
     def __init__(
         self,
         target_addr,
@@ -1962,43 +1980,32 @@ class TileSetTileEffect(Message):
         )
 
     def get_payload(self):
-        reserved = little_endian(bitstring.pack("int:8", 0))
-        instanceid = little_endian(bitstring.pack("uint:32", self.instanceid))
-        type = little_endian(bitstring.pack("uint:8", self.type))
-        speed = little_endian(bitstring.pack("uint:32", self.speed))
-        duration = little_endian(bitstring.pack("uint:64", self.duration))
-        sky_type = little_endian(bitstring.pack("uint:8", self.sky_type))
-        cloud_saturation_min = little_endian(
-            bitstring.pack("uint:8", self.cloud_saturation_min)
-        )
-        cloud_saturation_max = little_endian(
-            bitstring.pack("uint:8", self.cloud_saturation_max)
-        )
-        palette_count = little_endian(bitstring.pack("uint:8", self.palette_count))
-        payload = (
-            reserved * 2
-            + instanceid
-            + type
-            + speed
-            + duration
-            + reserved * 8
-            + sky_type
-            + reserved * 3
-            + cloud_saturation_min
-            + reserved * 3
-            + cloud_saturation_max
-            + reserved * 23
-            + palette_count
-        )
-        for color in self.palette:
-            payload += b"".join(
-                little_endian(bitstring.pack("uint:16", field)) for field in color
-            )
-
-        return payload
+        return payload_layout("<2xIBIQ8xB3xB3xB23xB", len(self.palette)).pack(
+            self.instanceid,
+            self.type,
+            self.speed,
+            self.duration,
+            self.sky_type,
+            self.cloud_saturation_min,
+            self.cloud_saturation_max,
+            self.palette_count,
+            *hsbk_values(self.palette),
+        )
 
 
 class TileStateTileEffect(Message):
+    __slots__ = (
+        "instanceid",
+        "effect",
+        "speed",
+        "duration",
+        "sky_type",
+        "cloud_saturation_min",
+        "cloud_saturation_max",
+        "palette_count",
+        "palette",
+    )
+
     def __init__(
         self,
         target_addr,
@@ -2026,44 +2033,33 @@ class TileStateTileEffect(Message):
             response_requested,
         )
 
-    def get_payload(self):
-        self.payload_fields.append("Instance ID", self.instanceid)
-        self.payload_fields.append("Effect", self.effect)
-        self.payload_fields.append("Speed", self.speed)
-        self.payload_fields.append("Duration", self.duration)
-        self.payload_fields.append("Sky Type", self.sky_type)
-        self.payload_fields.append("Cloud Saturation Min", self.cloud_saturation_min)
-        self.payload_fields.append("Cloud Saturation Max", self.cloud_saturation_max)
-        self.payload_fields.append("Palette Count", self.palette_count)
-        self.payload_fields.append("Palette", self.palette)
-        instanceid = little_endian(bitstring.pack("uint:32", self.instanceid))
-        effect = little_endian(bitstring.pack("uint:8", self.effect))
-        speed = little_endian(bitstring.pack("uint:32", self.speed))
-        duration = little_endian(bitstring.pack("uint:64", self.duration))
-        sky_type = little_endian(bitstring.pack("uint:8", self.sky_type))
-        cloud_saturation_min = little_endian(
-            bitstring.pack("uint:8", self.cloud_saturation_min)
-        )
-        cloud_saturation_max = little_endian(
-            bitstring.pack("uint:8", self.cloud_saturation_max)
-        )
-        palette_count = little_endian(bitstring.pack("uint:8", self.palette_count))
-        payload = (
-            instanceid
-            + effect
-            + speed
-            + duration
-            + sky_type
-            + cloud_saturation_min
-            + cloud_saturation_max
-            + palette_count
-        )
-        for color in self.palette:
-            payload += b"".join(
-                little_endian(bitstring.pack("uint:16", field)) for field in color
-            )
+    payload_labels = (
+        ("Instance ID", "instanceid"),
+        ("Effect", "effect"),
+        ("Speed", "speed"),
+        ("Duration", "duration"),
+        ("Sky Type", "sky_type"),
+        ("Cloud Saturation Min", "cloud_saturation_min"),
+        ("Cloud Saturation Max", "cloud_saturation_max"),
+        ("Palette Count", "palette_count"),
+        ("Palette", "palette"),
+    )
 
-        return payload
+    def get_payload(self):
+        # The palette always holds 16 colours, the unused ones are zero
+        palette = list(self.palette)[:16]
+        palette += [(0, 0, 0, 0)] * (16 - len(palette))
+        return payload_layout("<xIBIQ8xB3xB3xB23xB", 16).pack(
+            self.instanceid,
+            self.effect,
+            self.speed,
+            self.duration,
+            self.sky_type,
+            self.cloud_saturation_min,
+            self.cloud_saturation_max,
+            self.palette_count,
+            *hsbk_values(palette),
+        )
 
     @property
     def effect_str(self):
@@ -2081,6 +2077,8 @@ class TileStateTileEffect(Message):
 
 
 class GetRPower(Message):
+    __slots__ = ("relay_index",)
+
     def __init__(
         self,
         target_addr,
@@ -2100,14 +2098,16 @@ class GetRPower(Message):
             response_requested,
         )
 
+    payload_labels = (("Relay Index", "relay_index"),)
+    payload_struct = struct.Struct("<B")
+
     def get_payload(self):
-        self.payload_fields.append(("Relay Index", self.relay_index))
-        relay_index = little_endian(bitstring.pack("uint:8", self.relay_index))
-        payload = relay_index
-        return payload
+        return self.payload_struct.pack(self.relay_index)
 
 
 class SetRPower(Message):
+    __slots__ = ("relay_index", "level")
+
     def __init__(
         self,
         target_addr,
@@ -2128,16 +2128,16 @@ class SetRPower(Message):
             response_requested,
         )
 
+    payload_labels = (("Relay Index", "relay_index"), ("Level", "level"))
+    payload_struct = struct.Struct("<BH")
+
     def get_payload(self):
-        self.payload_fields.append(("Relay Index", self.relay_index))
-        self.payload_fields.append(("Level", self.level))
-        relay_index = little_endian(bitstring.pack("uint:8", self.relay_index))
-        level = little_endian(bitstring.pack("uint:16", self.level))
-        payload = relay_index + level
-        return payload
+        return self.payload_struct.pack(self.relay_index, self.level)
 
 
 class StateRPower(Message):
+    __slots__ = ("relay_index", "level")
+
     def __init__(
         self,
         target_addr,
@@ -2158,13 +2158,11 @@ class StateRPower(Message):
             response_requested,
         )
 
+    payload_labels = (("Relay Index", "relay_index"), ("Level", "level"))
+    payload_struct = struct.Struct("<BH")
+
     def get_payload(self):
-        self.payload_fields.append(("Relay Index", self.relay_index))
-        self.payload_fields.append(("Level", self.level))
-        relay_index = little_endian(bitstring.pack("uint:8", self.relay_index))
-        level = little_endian(bitstring.pack("uint:32", self.level))
-        payload = relay_index + level
-        return payload
+        return self.payload_struct.pack(self.relay_index, self.level)
 
 
 ##### SWITCH BUTTON MESSAGES #####
@@ -2172,6 +2170,8 @@ class StateRPower(Message):
 
 
 class GetButton(Message):
+    __slots__ = ()
+
     def __init__(
         self,
         target_addr,
@@ -2192,6 +2192,8 @@ class GetButton(Message):
 
 
 class SetButton(Message):
+    __slots__ = ()
+
     def __init__(
         self,
         target_addr,
@@ -2216,6 +2218,8 @@ class SetButton(Message):
 
 
 class StateButton(Message):
+    __slots__ = ("count", "index", "buttons_count", "buttons")
+
     def __init__(
         self,
         target_addr,
@@ -2240,6 +2244,8 @@ class StateButton(Message):
 
 
 class GetButtonConfig(Message):
+    __slots__ = ()
+
     def __init__(
         self,
         target_addr,
@@ -2260,6 +2266,8 @@ class GetButtonConfig(Message):
 
 
 class SetButtonConfig(Message):
+    __slots__ = ("haptic_duration_ms", "backlight_on_color", "backlight_off_color")
+
     def __init__(
         self,
         target_addr,
@@ -2281,43 +2289,32 @@ class SetButtonConfig(Message):
             response_requested,
         )
 
-    def get_payload(self):
-        self.payload_fields.append(("haptic_duration_ms", self.haptic_duration_ms))
-        self.payload_fields.append(("backlight_on_color", self.backlight_on_color))
-        self.payload_fields.append(("backlight_off_color", self.backlight_off_color))
-        haptic_duration_ms = little_endian(
-            bitstring.pack("uint:16", self.haptic_duration_ms)
-        )
-
-        hue = self.backlight_on_color["hue"]
-        saturation = self.backlight_on_color["saturation"]
-        brightness = self.backlight_on_color["brightness"]
-        kelvin = self.backlight_on_color["kelvin"]
+    payload_labels = (
+        ("haptic_duration_ms", "haptic_duration_ms"),
+        ("backlight_on_color", "backlight_on_color"),
+        ("backlight_off_color", "backlight_off_color"),
+    )
+    payload_struct = struct.Struct("<H4H4H")
 
-        backlight_on_color = (
-            little_endian(bitstring.pack("uint:16", hue))
-            + little_endian(bitstring.pack("uint:16", saturation))
-            + little_endian(bitstring.pack("uint:16", brightness))
-            + little_endian(bitstring.pack("uint:16", kelvin))
+    def get_payload(self):
+        on = self.backlight_on_color
+        off = self.backlight_off_color
+        return self.payload_struct.pack(
+            self.haptic_duration_ms,
+            on["hue"],
+            on["saturation"],
+            on["brightness"],
+            on["kelvin"],
+            off["hue"],
+            off["saturation"],
+            off["brightness"],
+            off["kelvin"],
         )
 
-        hue = self.backlight_off_color["hue"]
-        saturation = self.backlight_off_color["saturation"]
-        brightness = self.backlight_off_color["brightness"]
-        kelvin = self.backlight_off_color["kelvin"]
-
-        backlight_off_color = (
-            little_endian(bitstring.pack("uint:16", hue))
-            + little_endian(bitstring.pack("uint:16", saturation))
-            + little_endian(bitstring.pack("uint:16", brightness))
-            + little_endian(bitstring.pack("uint:16", kelvin))
-        )
-
-        payload = haptic_duration_ms + backlight_on_color + backlight_off_color
-        return payload
-
 
 class StateButtonConfig(Message):
+    __slots__ = ("haptic_duration_ms", "backlight_on_color", "backlight_off_color")
+
     def __init__(
         self,
         target_addr,
@@ -2339,6 +2336,28 @@ class StateButtonConfig(Message):
             response_requested,
         )
 
+    payload_labels = (
+        ("haptic_duration_ms", "haptic_duration_ms"),
+        ("backlight_on_color", "backlight_on_color"),
+        ("backlight_off_color", "backlight_off_color"),
+    )
+    payload_struct = struct.Struct("<H4H4H")
+
+    def get_payload(self):
+        on = self.backlight_on_color
+        off = self.backlight_off_color
+        return self.payload_struct.pack(
+            self.haptic_duration_ms,
+            on["hue"],
+            on["saturation"],
+            on["brightness"],
+            on["kelvin"],
+            off["hue"],
+            off["saturation"],
+            off["brightness"],
+            off["kelvin"],
+        )
+
 
 MSG_IDS = {
     GetService: 2,
@@ -2417,6 +2436,30 @@ MSG_IDS = {
     StateButtonConfig: 911,
 }
 
+# Messages changing the state of the device, the others only read it
+WRITE_MESSAGES = frozenset(
+    {
+        SetPower,
+        SetLabel,
+        SetReboot,
+        LightSetColor,
+        LightSetWaveform,
+        LightSetWaveformOptional,
+        LightSetPower,
+        LightSetInfrared,
+        SetHevCycle,
+        SetHevCycleConfiguration,
+        MultiZoneSetColorZones,
+        MultiZoneSetMultiZoneEffect,
+        MultiZoneSetExtendedColorZones,
+        TileSet64,
+        TileSetTileEffect,
+        SetRPower,
+        SetButton,
+        SetButtonConfig,
+    }
+)
+
 SERVICE_IDS = {1: "UDP", 2: "reserved", 3: "reserved", 4: "reserved"}
 
 STR_MAP = {65535: "On", 0: "Off", None: "Unknown"}
@@ -2451,7 +2494,7 @@ class Button:
             self.actions.append(ButtonAction(data[1 + i * 20 : 1 + (i + 1) * 20]))
 
     def get_payload(self):
-        payload = little_endian(bitstring.pack("uint:8", self.actions_count))
+        payload = bytes((self.actions_count,))
         for action in self.actions:
             payload += action.get_payload()
         return payload
@@ -2470,21 +2513,18 @@ class ButtonAction:
         else:
             self.target = None
 
+    payload_struct = struct.Struct("<HH")
+
     def get_payload(self):
-        payload = little_endian(bitstring.pack("uint:16", self.gesture.value))
-        payload += little_endian(bitstring.pack("uint:16", self.target_type.value))
+        payload = self.payload_struct.pack(self.gesture.value, self.target_type.value)
         if self.target_type == ButtonTargetType.RELAYS:
-            payload += little_endian(bitstring.pack("uint:8", self.target.relays_count))
-            for relay in self.target.relays:
-                payload += little_endian(bitstring.pack("uint:8", relay))
+            payload += bytes((self.target.relays_count,)) + bytes(self.target.relays)
         elif self.target_type == ButtonTargetType.DEVICE:
             payload += self.target.serial
             payload += self.target.reserved
         elif self.target_type == ButtonTargetType.DEVICE_RELAYS:
             payload += self.target.serial
-            payload += little_endian(bitstring.pack("uint:8", self.target.relays_count))
-            for relay in self.target.relays:
-                payload += little_endian(bitstring.pack("uint:8", relay))
+            payload += bytes((self.target.relays_count,)) + bytes(self.target.relays)
         return payload
 
 
@@ -0,0 +1,427 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+#
+# Micro-benchmark of the aiolifx message codec
+#
+# For every message type in MSG_IDS, this measures the time it takes to build and
+# pack a message (encode), to unpack a received datagram (decode) and the memory
+# allocated by each. Results are written as JSON so that releases can be compared:
+#
+#   pip install -e .  # or PYTHONPATH=. from a checkout
+#   python benchmarks/codec.py -o before.json
+#   python benchmarks/codec.py -o after.json --compare before.json --threshold 10
+#
+# With --compare, the exit status is 1 if any measure regressed by more than the
+# threshold (in percent).
+import datetime
+import json
+import platform
+import sys
+import timeit
+import tracemalloc
+
+import click
+
+from aiolifx.message import Message
+from aiolifx.msgtypes import *
+from aiolifx.unpack import unpack_lifx_message
+
+TARGET_ADDR = "d0:73:d5:01:02:03"
+SOURCE_ID = 0x2A5F8C13
+SEQ_NUM = 42
+MEASURES = ("encode_us", "decode_us", "encode_bytes", "decode_bytes")
+# Minimum duration of one timing run, in seconds
+RUN_TIME = 0.02
+
+
+def hsbk(count):
+    """A gradient of count HSBK tuples, like what an effect would send"""
+    return [
+        ((i * 65535) // count, 65535, 32768 + (i % 2) * 16384, 3500)
+        for i in range(count)
+    ]
+
+
+def tile(index):
+    return {
+        "accel_meas_x": 12,
+        "accel_meas_y": -980,
+        "accel_meas_z": 40,
+        "user_x": float(index),
+        "user_y": 0.0,
+        "width": 8,
+        "height": 8,
+        "device_version_vendor": 1,
+        "device_version_product": 55,
+        "firmware_build": 1548977726000000000,
+        "firmware_version_minor": 50,
+        "firmware_version_major": 3,
+    }
+
+
+BACKLIGHT = {"hue": 0, "saturation": 0, "brightness": 32768, "kelvin": 3500}
+
+# Realistic payload of each message type, the bulk ones are full size.
+PAYLOADS = {
+    StateService: {"service": 1, "port": 56700},
+    StateHostInfo: {"signal": 1.0e-5, "tx": 0, "rx": 0, "reserved1": 0},
+    StateHostFirmware: {
+        "build": 1548977726000000000,
+        "reserved1": 0,
+        "version": (3 << 16) | 70,
+    },
+    StateWifiInfo: {"signal": 3.16e-6, "tx": 0, "rx": 0, "reserved1": 0},
+    StateWifiFirmware: {"build": 0, "reserved1": 0, "version": 0},
+    SetPower: {"power_level": 65535},
+    StatePower: {"power_level": 65535},
+    SetLabel: {"label": "Living Room Lamp"},
+    StateLabel: {"label": b"Living Room Lamp"},
+    StateVersion: {"vendor": 1, "product": 55, "version": 0},
+    StateInfo: {
+        "time": 1700000000000000000,
+        "uptime": 86400000000000,
+        "downtime": 5000000000,
+    },
+    StateLocation: {
+        "location": list(range(16)),
+        "label": b"Home",
+        "updated_at": 1700000000000000000,
+    },
+    StateGroup: {
+        "group": list(range(16, 32)),
+        "label": b"Living Room",
+        "updated_at": 1700000000000000000,
+    },
+    EchoRequest: {"byte_array": list(range(64))},
+    EchoResponse: {"byte_array": list(range(64))},
+    LightSetColor: {"color": (21845, 65535, 65535, 3500), "duration": 1000},
+    LightSetWaveform: {
+        "transient": 1,
+        "color": (21845, 65535, 65535, 3500),
+        "period": 1000,
+        "cycles": 5.0,
+        "skew_ratio": 0,
+        "waveform": 1,
+    },
+    LightSetWaveformOptional: {
+        "transient": 1,
+        "color": (21845, 65535, 65535, 3500),
+        "period": 1000,
+        "cycles": 5.0,
+        "skew_ratio": 0,
+        "waveform": 1,
+        "set_hue": 1,
+        "set_saturation": 0,
+        "set_brightness": 1,
+        "set_kelvin": 0,
+    },
+    LightState: {
+        "color": (21845, 65535, 65535, 3500),
+        "reserved1": 0,
+        "power_level": 65535,
+        "label": b"Living Room Lamp",
+        "reserved2": 0,
+    },
+    LightSetPower: {"power_level": 65535, "duration": 1000},
+    LightStatePower: {"power_level": 65535},
+    LightStateInfrared: {"infrared_brightness": 16384},
+    LightSetInfrared: {"infrared_brightness": 16384},
+    SetHevCycle: {"enable": 1, "duration": 7200},
+    StateHevCycle: {"duration": 7200, "remaining": 3600, "last_power": 1},
+    SetHevCycleConfiguration: {"indication": 1, "duration": 7200},
+    StateHevCycleConfiguration: {"indication": 1, "duration": 7200},
+    StateLastHevCycleResult: {"result": 0},
+    MultiZoneSetColorZones: {
+        "start_index": 0,
+        "end_index": 15,
+        "color": (21845, 65535, 65535, 3500),
+        "duration": 0,
+        "apply": 1,
+    },
+    MultiZoneGetColorZones: {"start_index": 0, "end_index": 255},
+    MultiZoneStateZone: {
+        "count": 16,
+        "index": 0,
+        "color": (21845, 65535, 65535, 3500),
+    },
+    MultiZoneStateMultiZone: {"count": 16, "index": 0, "color": hsbk(8)},
+    MultiZoneSetMultiZoneEffect: {
+        "type": 1,
+        "speed": 3000,
+        "duration": 0,
+        "direction": 1,
+    },
+    MultiZoneStateMultiZoneEffect: {
+        "instanceid": 1234,
+        "effect": 1,
+        "speed": 3000,
+        "duration": 0,
+        "direction": 1,
+    },
+    MultiZoneSetExtendedColorZones: {
+        "duration": 0,
+        "apply": 1,
+        "zone_index": 0,
+        "colors_count": 82,
+        "colors": hsbk(82),
+    },
+    MultiZoneStateExtendedColorZones: {
+        "zones_count": 82,
+        "zone_index": 0,
+        "colors_count": 82,
+        "colors": hsbk(82),
+    },
+    TileStateDeviceChain: {
+        "start_index": 0,
+        "tile_devices": [tile(i) for i in range(16)],
+        "tile_devices_count": 5,
+    },
+    TileGet64: {"tile_index": 0, "length": 5, "x": 0, "y": 0, "width": 8},
+    TileSet64: {
+        "tile_index": 0,
+        "length": 1,
+        "x": 0,
+        "y": 0,
+        "width": 8,
+        "duration": 0,
+        "colors": hsbk(64),
+    },
+    TileState64: {"tile_index": 0, "x": 0, "y": 0, "width": 8, "colors": hsbk(64)},
+    TileSetTileEffect: {
+        "type": 2,
+        "speed": 3000,
+        "duration": 0,
+        "sky_type": 0,
+        "cloud_saturation_min": 50,
+        "cloud_saturation_max": 180,
+        "palette_count": 16,
+        "palette": hsbk(16),
+    },
+    TileStateTileEffect: {
+        "instanceid": 1234,
+        "effect": 2,
+        "speed": 3000,
+        "duration": 0,
+        "sky_type": 0,
+        "cloud_saturation_min": 50,
+        "cloud_saturation_max": 180,
+        "palette_count": 16,
+        "palette": hsbk(16),
+    },
+    GetRPower: {"relay_index": 0},
+    SetRPower: {"relay_index": 0, "level": 65535},
+    StateRPower: {"relay_index": 0, "level": 65535},
+    StateButton: {"count": 4, "index": 0, "buttons_count": 4, "buttons": []},
+    SetButtonConfig: {
+        "haptic_duration_ms": 50,
+        "backlight_on_color": BACKLIGHT,
+        "backlight_off_color": BACKLIGHT,
+    },
+    StateButtonConfig: {
+        "haptic_duration_ms": 50,
+        "backlight_on_color": BACKLIGHT,
+        "backlight_off_color": BACKLIGHT,
+    },
+}
+
+
+def state_button_payload():
+    """StateButton is not encoded by aiolifx, this is what a switch sends:
+    8 buttons of 5 actions each, toggling relays."""
+    action = struct.pack("<HHB15s", 1, 2, 2, bytes((0, 1)))
+    button = bytes((5,)) + action * 5
+    return bytes((4, 0, 4)) + button * 8
+
+
+# Received datagrams that cannot be produced by the encoder
+RAW_PAYLOADS = {StateButton: state_button_payload}
+
+
+def build(msg_class):
+    return msg_class(
+        TARGET_ADDR,
+        SOURCE_ID,
+        SEQ_NUM,
+        PAYLOADS.get(msg_class, {}),
+        ack_requested=True,
+        response_requested=False,
+    )
+
+
+def datagram(msg_class):
+    """The datagram the decoder is benchmarked on"""
+    if msg_class in RAW_PAYLOADS:
+        msg = Message(MSG_IDS[msg_class], TARGET_ADDR, SOURCE_ID, SEQ_NUM)
+        msg.payload = RAW_PAYLOADS[msg_class]()
+        return msg.get_header() + msg.payload
+    return build(msg_class).generate_packed_message()
+
+
+def timing(func, repeat):
+    """Best time of a call, in microseconds"""
+    timer = timeit.Timer(func)
+    number = 1
+    while timer.timeit(number) < RUN_TIME:
+        number *= 2
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1e6
+
+
+def allocated(func):
+    """Peak memory allocated by a call, in bytes"""
+    func()  # Warm the caches up
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak - before
+
+
+def run(msg_classes, repeat):
+    results = {}
+    for msg_class in msg_classes:
+        try:
+            packed = datagram(msg_class)
+        except Exception as e:
+            click.echo("Skipping {}: {}".format(msg_class.__name__, e), err=True)
+            continue
+
+        def encode():
+            return build(msg_class).generate_packed_message()
+
+        def decode():
+            return unpack_lifx_message(packed)
+
+        results[msg_class.__name__] = {
+            "type": MSG_IDS[msg_class],
+            "size": len(packed),
+            "encode_us": round(timing(encode, repeat), 3),
+            "decode_us": round(timing(decode, repeat), 3),
+            "encode_bytes": allocated(encode),
+            "decode_bytes": allocated(decode),
+        }
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Return the (message, measure, baseline, current) that regressed more than threshold %"""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        for measure in MEASURES:
+            if previous.get(measure) and current[measure] > previous[measure] * (
+                1 + threshold / 100
+            ):
+                regressions.append((name, measure, previous[measure], current[measure]))
+    return regressions
+
+
+def version():
+    try:
+        from importlib.metadata import version
+
+        return version("aiolifx")
+    except Exception:
+        return "unknown"
+
+
+@click.command()
+@click.option(
+    "-o",
+    "--output",
+    type=click.File("w"),
+    default="-",
+    help="Where to write the JSON results (default: stdout).",
+)
+@click.option(
+    "--compare",
+    "baseline",
+    type=click.File("r"),
+    default=None,
+    help="JSON results of a previous run to compare against.",
+)
+@click.option(
+    "--threshold",
+    type=float,
+    default=10.0,
+    show_default=True,
+    help="Regression threshold, in percent, used with --compare.",
+)
+@click.option(
+    "-k",
+    "--filter",
+    "pattern",
+    default=None,
+    help="Only benchmark the message types whose name contains this.",
+)
+@click.option(
+    "--repeat", type=int, default=5, show_default=True, help="Timing repetitions."
+)
+def cli(output, baseline, threshold, pattern, repeat):
+    """Benchmark encoding and decoding of every LIFX message type."""
+    msg_classes = [
+        msg_class
+        for msg_class in MSG_IDS
+        if pattern is None or pattern.lower() in msg_class.__name__.lower()
+    ]
+    results = run(msg_classes, repeat)
+    json.dump(
+        {
+            "meta": {
+                "aiolifx": version(),
+                "python": platform.python_version(),
+                "implementation": platform.python_implementation(),
+                "machine": platform.machine(),
+                "date": datetime.datetime.now().isoformat(timespec="seconds"),
+            },
+            "results": results,
+        },
+        output,
+        indent=2,
+    )
+    output.write("\n")
+
+    click.echo(
+        "{:<34}{:>6}{:>12}{:>12}{:>10}{:>10}".format(
+            "Message", "Size", "Encode us", "Decode us", "Enc B", "Dec B"
+        ),
+        err=True,
+    )
+    for name, result in results.items():
+        click.echo(
+            "{:<34}{:>6}{:>12.2f}{:>12.2f}{:>10}{:>10}".format(
+                name,
+                result["size"],
+                result["encode_us"],
+                result["decode_us"],
+                result["encode_bytes"],
+                result["decode_bytes"],
+            ),
+            err=True,
+        )
+
+    if baseline is not None:
+        regressions = compare(results, json.load(baseline)["results"], threshold)
+        for name, measure, previous, current in regressions:
+            click.echo(
+                "REGRESSION {} {}: {} -> {} (+{:.1f}%)".format(
+                    name,
+                    measure,
+                    previous,
+                    current,
+                    (current / previous - 1) * 100,
+                ),
+                err=True,
+            )
+        if regressions:
+            sys.exit(1)
+        click.echo("No regression above {}%".format(threshold), err=True)
+
+
+if __name__ == "__main__":
+    cli()
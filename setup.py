@@ -20,12 +20,11 @@ setuptools.setup(
     keywords=["lifx", "light", "automation"],
     license="MIT",
     install_requires=[
-        "async_timeout>=3.0.1",
-        "bitstring",
         "ifaddr",
         "click>=8.1.0,<8.2.0",
         "InquirerPy>=0.3.0,<0.4.0",
     ],
+    extras_require={"numpy": ["numpy"]},
     # See https://pypi.python.org/pypi?%3Aaction=list_classifiers
     classifiers=[
         # Pick your license as you wish (should match "license" above)
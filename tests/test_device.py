@@ -0,0 +1,250 @@
+import asyncio as aio
+import json
+
+from aiolifx.aiolifx import REPLACED, Light, SharedSocket, fire_and_forget_batch
+from aiolifx.message import HSBKColors, HSBKZones, Message
+from aiolifx.msgtypes import (
+    LightGet,
+    LightSetPower,
+    LightState,
+    MultiZoneGetExtendedColorZones,
+    MultiZoneStateExtendedColorZones,
+)
+from aiolifx.unpack import unpack_lifx_header, unpack_lifx_message
+
+MAC_ADDR = "d0:73:d5:00:00:01"
+
+
+class FakeTransport:
+    """Transport keeping the datagrams sent, nothing ever answers."""
+
+    def __init__(self):
+        self.sent = []
+
+    def sendto(self, data, addr=None):
+        self.sent.append(unpack_lifx_header(data))
+
+    def is_closing(self):
+        return False
+
+    def close(self):
+        pass
+
+    def get_extra_info(self, name, default=None):
+        return default
+
+
+async def connected_light():
+    light = Light(aio.get_running_loop(), MAC_ADDR, "192.0.2.1", 56700)
+    light.connection_made(FakeTransport())
+    return light
+
+
+def test_error_received_fails_ack_requests():
+    async def run():
+        light = await connected_light()
+        answers = []
+        task = aio.create_task(
+            light.async_req_with_ack(
+                LightSetPower,
+                {"power_level": 65535, "duration": 0},
+                callb=lambda device, response: answers.append(response),
+                timeout_secs=5,
+            )
+        )
+        await aio.sleep(0)
+        assert light.message
+        light.error_received(ConnectionRefusedError())
+        assert await aio.wait_for(task, 1) is None
+        assert answers == [None]
+        assert not light.message and not light.reply_queue
+        light.cleanup()
+
+    aio.run(run())
+
+
+def test_unexpected_reply_fails_request():
+    async def run():
+        light = await connected_light()
+        answers = []
+        task = aio.create_task(
+            light.async_req_with_resp(
+                MultiZoneGetExtendedColorZones,
+                MultiZoneStateExtendedColorZones,
+                callb=lambda device, response: answers.append(response),
+                timeout_secs=5,
+            )
+        )
+        await aio.sleep(0)
+        request = light.transport.sent[-1]
+        # StateUnhandled, not known to the library
+        unhandled = Message(223, MAC_ADDR, request.source_id, request.seq_num)
+        light.datagram_received(unhandled.packed_message, ("192.0.2.1", 56700))
+        assert await aio.wait_for(task, 1) is None
+        assert answers == [None]
+        assert not light.message and not light.sent_at
+        light.cleanup()
+
+    aio.run(run())
+
+
+def extended_zones_reply(colors):
+    reply = MultiZoneStateExtendedColorZones(
+        MAC_ADDR,
+        1234,
+        5,
+        {
+            "zones_count": 100,
+            "zone_index": 82,
+            "colors_count": 18,
+            "colors": colors + [(0, 0, 0, 0)] * 64,
+        },
+    )
+    return unpack_lifx_message(reply.packed_message)
+
+
+def test_extended_zones_are_a_list():
+    async def run():
+        light = await connected_light()
+        light.zones_count = 100
+        light.color_zones = light.new_color_zones(100)
+        colors = [(i, i + 1, i + 2, 3500) for i in range(18)]
+        light.resp_set_multizoneextendedcolorzones(extended_zones_reply(colors))
+        assert type(light.color_zones) is list
+        assert light.color_zones == [None] * 82 + colors
+        assert json.loads(json.dumps(light.color_zones))[82] == list(colors[0])
+        light.cleanup()
+
+    aio.run(run())
+
+
+def test_extended_zones_are_kept_packed():
+    async def run():
+        light = await connected_light()
+        light.packed_zones = True
+        light.zones_count = 100
+        light.color_zones = light.new_color_zones(100)
+        assert isinstance(light.color_zones, HSBKZones)
+        colors = [(i, i + 1, i + 2, 3500) for i in range(18)]
+        response = extended_zones_reply(colors)
+        assert isinstance(response.colors, HSBKColors)
+        light.resp_set_multizoneextendedcolorzones(response)
+        assert light.color_zones[82:] == colors
+        assert light.color_zones[:82] == [None] * 82
+        assert None in light.color_zones
+        assert bytes(light.color_zones.packed()[82 * 8 :]) == bytes(
+            response.colors[:18].packed()
+        )
+        light.cleanup()
+
+    aio.run(run())
+
+
+def test_dropped_request_fails_right_away():
+    async def run():
+        light = await connected_light()
+        light.sender.limit = 4
+        answers = {}
+        for level in range(10):
+            light.req_with_ack(
+                LightSetPower,
+                {"power_level": level, "duration": 0},
+                callb=lambda device, response, level=level: answers.setdefault(
+                    level, response
+                ),
+            )
+        # 5 sent with the burst, 4 queued, the last one dropped
+        assert len(light.transport.sent) == 5
+        assert light.sender.dropped == 1
+        assert answers == {9: None}
+        assert len(light.message) == 9 and len(light.sent_at) == 5
+        light.cleanup()
+
+    aio.run(run())
+
+
+def test_batch_write_replaces_pending_write():
+    async def run():
+        light = await connected_light()
+        light.coalesce = True
+        answers = []
+        light.req_with_ack(
+            LightSetPower,
+            {"power_level": 0, "duration": 0},
+            callb=lambda device, response: answers.append(response),
+        )
+        assert light.message
+        fire_and_forget_batch(
+            [(light, LightSetPower, {"power_level": 65535, "duration": 0})]
+        )
+        assert answers == [REPLACED]
+        assert not light.message and not light.writes
+        light.cleanup()
+
+    aio.run(run())
+
+
+def test_shared_socket_error_fails_requests():
+    async def run():
+        shared = SharedSocket(aio.get_running_loop())
+        shared.connection_made(FakeTransport())
+        light = Light(aio.get_running_loop(), MAC_ADDR, "192.0.2.1", 56700)
+        shared.attach(light, ("192.0.2.1", 56700))
+        task = aio.create_task(
+            light.async_req_with_ack(
+                LightSetPower, {"power_level": 65535, "duration": 0}, timeout_secs=5
+            )
+        )
+        await aio.sleep(0)
+        assert light.message
+        shared.error_received(ConnectionRefusedError())
+        assert await aio.wait_for(task, 1) is None
+        light.cleanup()
+        shared.cleanup()
+
+    aio.run(run())
+
+
+def test_cancelled_owner_fails_joined_callbacks():
+    async def run():
+        light = await connected_light()
+        owner = aio.create_task(
+            light.async_req_with_resp(LightGet, LightState, timeout_secs=5)
+        )
+        await aio.sleep(0)
+        answers = []
+        light.req_with_resp(
+            LightGet,
+            LightState,
+            callb=lambda device, response: answers.append(response),
+        )
+        assert len(light.transport.sent) == 1  # Joined the pending request
+        owner.cancel()
+        await aio.gather(owner, return_exceptions=True)
+        assert answers == [None]
+        assert not light.message
+        light.cleanup()
+
+    aio.run(run())
+
+
+def test_headers_come_from_the_device_templates():
+    async def run():
+        light = await connected_light()
+        light.sender.burst = light.sender.tokens = 10
+        for level in (0, 65535):
+            light.req_with_ack(LightSetPower, {"power_level": level, "duration": 0})
+        assert list(light.header_templates) == [(light.source_id, 117)]
+        for header in light.transport.sent:
+            msg = LightSetPower(
+                MAC_ADDR,
+                header.source_id,
+                header.seq_num,
+                {"power_level": 0, "duration": 0},
+                ack_requested=True,
+            )
+            # Same header as a message packed without template cache
+            assert msg.packed_message[:36] == header.packed_message[:36]
+        light.cleanup()
+
+    aio.run(run())
@@ -0,0 +1,15 @@
+import ipaddress
+
+import pytest
+
+from aiolifx.aiolifx import sweep_network
+
+
+def test_sweep_network_accepts_ipv4_networks():
+    assert sweep_network("192.168.4.7/22") == ipaddress.ip_network("192.168.4.0/22")
+
+
+@pytest.mark.parametrize("network", ["10.0.0.0/8", "fe80::/64", "not a network"])
+def test_sweep_network_rejects(network):
+    with pytest.raises(ValueError):
+        sweep_network(network)
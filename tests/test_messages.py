@@ -0,0 +1,37 @@
+from aiolifx.msgtypes import SetLabel, TileStateTileEffect
+from aiolifx.unpack import unpack_lifx_message
+
+MAC_ADDR = "d0:73:d5:00:00:01"
+
+
+def test_tile_effect_short_palette_round_trip():
+    palette = [(1, 2, 3, 4), (5, 6, 7, 8), (9, 10, 11, 12)]
+    msg = TileStateTileEffect(
+        MAC_ADDR,
+        1234,
+        5,
+        {
+            "instanceid": 42,
+            "effect": 2,
+            "speed": 3000,
+            "duration": 0,
+            "sky_type": 0,
+            "cloud_saturation_min": 0,
+            "cloud_saturation_max": 0,
+            "palette_count": len(palette),
+            "palette": palette,
+        },
+    )
+    data = msg.packed_message
+    decoded = unpack_lifx_message(data)
+    assert decoded.palette_count == 3
+    assert list(decoded.palette) == palette + [(0, 0, 0, 0)] * 13
+    assert decoded.generate_packed_message() == data
+
+
+def test_set_label_is_cut_between_characters():
+    label = "Lumière " * 5
+    msg = SetLabel(MAC_ADDR, 1234, 5, {"label": label})
+    packed = unpack_lifx_message(msg.packed_message).label
+    assert len(packed) == 32
+    assert packed.decode().rstrip("\x00") == label.encode()[:31].decode()